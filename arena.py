@@ -0,0 +1,145 @@
+"""This module defines a compact, array-backed representation of formulas in propositional logic.
+
+A FormulaArena stores many formulas as nodes in typed arrays instead of one Python object per node:
+the kind of each node, and the indices of its immediate subformulas, live in array('b') and array('i').
+Atoms are interned to integer ids. Nodes are always stored after their subformulas, so a formula can be
+traversed bottom-up by a single forward loop over the arrays.
+
+For example, the piece of code below stores (p → (p v s)) and converts it back.
+
+arena = FormulaArena()
+root = arena.add(Implies(Atom('p'), Or(Atom('p'), Atom('s'))))
+arena.formula(root)
+"""
+
+from array import array
+from formula import Formula, Atom, Not, Implies, And, Or, BigAnd, BigOr
+from functions import distinct_postorder, immediate_subformulas
+
+# node kinds
+ATOM, NOT, IMPLIES, AND, OR, BIG_AND, BIG_OR = range(7)
+
+KIND_OF_CLASS = {Atom: ATOM, Not: NOT, Implies: IMPLIES, And: AND, Or: OR, BigAnd: BIG_AND, BigOr: BIG_OR}
+CLASS_OF_KIND = {kind: cls for cls, kind in KIND_OF_CLASS.items()}
+
+
+class FormulaArena:
+    """
+    Stores formula nodes in flat arrays. Node i has kind kinds[i], and its operands are
+    operands[offsets[i]:offsets[i + 1]]. For an atom node, the single operand is the atom id,
+    and atom_names[atom_id] is the name of the atom. indices maps each formula stored by add to its node, so
+    formulas added one after the other share their common subformulas.
+    """
+
+    def __init__(self):
+        self.kinds = array('b')
+        self.offsets = array('i', [0])
+        self.operands = array('i')
+        self.atom_names = []
+        self.atom_ids = {}
+        self.atom_nodes = array('i')
+        self.indices = {}
+    # end def
+
+    @classmethod
+    def from_buffers(cls, kinds, offsets, operands, atom_names: list, atom_nodes):
+        """Builds an arena over existing sequences, such as memoryviews of a memory-mapped file,
+        without copying them. Such an arena can be read but not extended."""
+        arena = cls.__new__(cls)
+        arena.kinds = kinds
+        arena.offsets = offsets
+        arena.operands = operands
+        arena.atom_names = atom_names
+        arena.atom_ids = {name: atom_id for atom_id, name in enumerate(atom_names)}
+        arena.atom_nodes = atom_nodes
+        return arena
+    # end def
+
+    def __len__(self):
+        return len(self.kinds)
+    # end def
+
+    def add_atom(self, name) -> int:
+        """Returns the index of the node of the atom with the given name, creating it if needed."""
+        atom_id = self.atom_ids.get(name)
+        if atom_id is not None:
+            return self.atom_nodes[atom_id]
+        atom_id = len(self.atom_names)
+        self.atom_names.append(name)
+        self.atom_ids[name] = atom_id
+        index = self._append(ATOM, (atom_id,))
+        self.atom_nodes.append(index)
+        return index
+    # end def
+
+    def add_node(self, kind: int, operands) -> int:
+        """Appends a connective node over the given operand node indices and returns its index."""
+        if kind == ATOM:
+            raise ValueError("atoms are added with add_atom")
+        return self._append(kind, operands)
+    # end def
+
+    def _append(self, kind: int, operands) -> int:
+        self.kinds.append(kind)
+        self.operands.extend(operands)
+        self.offsets.append(len(self.operands))
+        return len(self.kinds) - 1
+    # end def
+
+    def add(self, formula: Formula) -> int:
+        """Stores formula in the arena and returns the index of its root node.
+        Each distinct subformula is stored once, including the subformulas of formulas added before."""
+        indices = self.indices
+        for node in distinct_postorder(formula):
+            if node in indices:
+                continue
+            if isinstance(node, Atom):
+                indices[node] = self.add_atom(node.name)
+            else:
+                indices[node] = self._append(KIND_OF_CLASS[type(node)],
+                                             [indices[child] for child in immediate_subformulas(node)])
+        return indices[formula]
+    # end def
+
+    def kind(self, index: int) -> int:
+        return self.kinds[index]
+    # end def
+
+    def children(self, index: int) -> array:
+        """Returns the node indices of the immediate subformulas of node index (empty for atoms)."""
+        if self.kinds[index] == ATOM:
+            return self.operands[0:0]
+        return self.operands[self.offsets[index]:self.offsets[index + 1]]
+    # end def
+
+    def atom_id(self, index: int) -> int:
+        """Returns the atom id of an atom node."""
+        return self.operands[self.offsets[index]]
+    # end def
+
+    def reachable(self, root: int) -> list:
+        """Returns, in increasing order, the indices of the nodes of the formula rooted at root.
+        Since subformulas are stored first, this is also a bottom-up order."""
+        marked = bytearray(root + 1)
+        marked[root] = 1
+        kinds, offsets, operands = self.kinds, self.offsets, self.operands
+        for index in range(root, -1, -1):
+            if marked[index] and kinds[index] != ATOM:
+                for child in operands[offsets[index]:offsets[index + 1]]:
+                    marked[child] = 1
+        return [index for index in range(root + 1) if marked[index]]
+    # end def
+
+    def formula(self, root: int) -> Formula:
+        """Converts the formula rooted at root back into formula.py objects."""
+        built = {}
+        kinds, offsets, operands = self.kinds, self.offsets, self.operands
+        for index in self.reachable(root):
+            kind = kinds[index]
+            if kind == ATOM:
+                built[index] = Atom(self.atom_names[operands[offsets[index]]])
+            else:
+                built[index] = CLASS_OF_KIND[kind](*(built[child] for child in operands[offsets[index]:offsets[index + 1]]))
+        return built[root]
+    # end def
+# end class FormulaArena
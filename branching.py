@@ -0,0 +1,261 @@
+"""This module defines the branching heuristics of the CDCL Solver (see dpll.py): the rules choosing the literal
+assigned at each decision.
+
+Atoms are numbered as in a SymbolTable, and literals are coded as in the Solver: the atom v has the code 2 * v
+and its negation 2 * v + 1. Each heuristic gives every atom a score, and keeps the unassigned atoms in a binary
+max-heap ordered by score. A decision pops atoms until one is unassigned, and atoms are pushed back when the
+search backtracks over them, so a decision costs a logarithmic number of steps instead of a pass over the clauses.
+Scores are updated in place when clauses are added or conflicts are met, and are never recomputed from scratch.
+
+- max_occurrences: the atom of the literal with most occurrences in the clauses (not counting learned clauses);
+- jeroslow_wang: the atom with the largest sum of 2 ** -len(clause) over the clauses where it occurs;
+- vsids: the atom occurring most in the clauses learned from recent conflicts, where every score is halved
+  after a fixed number of conflicts;
+- evsids: the atom taking part most in recent conflicts, where the amount added to scores grows geometrically
+  instead of halving old scores (as in MiniSat).
+
+max_occurrences and jeroslow_wang are static orders: occurrences are counted once, when clauses are added, and
+clauses satisfied during the search are still counted. Keeping counts over the unsatisfied clauses, as DLIS does,
+would cost an update per clause of each assigned literal. Only the dpll function (see dpll.py) branches by DLIS,
+recounting occurrences in the clauses left at each call.
+
+The truth value chosen is the one the atom had when it was last unassigned (phase saving), unless phase saving is
+off or the atom was never assigned: then it is the literal of the atom with more weight in the clauses.
+
+For example, the piece of code below solves a formula deciding with Jeroslow-Wang scores.
+
+solver = Solver(clause_store_of([formula]), heuristic=JEROSLOW_WANG)
+solver.solve()
+"""
+
+MAX_OCCURRENCES, JEROSLOW_WANG, VSIDS, EVSIDS = 'max_occurrences', 'jeroslow_wang', 'vsids', 'evsids'
+# the rule of the dpll function, which is not a BranchingHeuristic
+DLIS = 'dlis'
+
+# value of phases for atoms that were never assigned
+_NO_PHASE = 2
+
+
+class BranchingHeuristic:
+    """
+    Keeps the atoms in a binary max-heap ordered by scores[v], then by atom number. weights[code] is the sum of
+    self.weight(len(clause)) over the clauses added with the literal code, and chooses the truth value of atoms
+    with no saved phase.
+    Subclasses define how scores follow the weights and the conflicts.
+    """
+
+    def __init__(self, phase_saving: bool = True):
+        self.phase_saving = phase_saving
+        # indexed by literal code
+        self.weights = [0, 0]
+        # indexed by atom number
+        self.scores = [0]
+        self.phases = bytearray([_NO_PHASE])
+        self.positions = [-1]
+        self.heap = []
+    # end def
+
+    def grow(self, atoms: int):
+        """Makes room for the atoms numbered up to atoms, and puts the new ones in the heap."""
+        for v in range(len(self.scores), atoms + 1):
+            self.weights.extend((0, 0))
+            self.scores.append(0)
+            self.phases.append(_NO_PHASE)
+            self.positions.append(-1)
+            self._push(v)
+    # end def
+
+    def weight(self, size: int):
+        return 1
+    # end def
+
+    def score(self, v: int):
+        """The score of the atom v, computed from its weights."""
+        return self.weights[v << 1] + self.weights[v << 1 | 1]
+    # end def
+
+    def clause_added(self, codes: list):
+        """Called for each clause added to the solver, but not for learned clauses."""
+        weight, weights, scores = self.weight(len(codes)), self.weights, self.scores
+        for code in codes:
+            weights[code] += weight
+            v = code >> 1
+            scores[v] = self.score(v)
+            self._increased(v)
+    # end def
+
+    def conflict(self, involved: list, learned: list):
+        """Called after each conflict with the atoms met while analyzing it and the codes of the learned clause."""
+    # end def
+
+    def unassigned(self, code: int):
+        """Called for each literal code made unassigned by backtracking."""
+        v = code >> 1
+        self.phases[v] = code & 1
+        if self.positions[v] < 0:
+            self._push(v)
+    # end def
+
+    def decide(self, values) -> int:
+        """Returns the code of the literal to assign next, given the values of the solver (indexed by code,
+        0 for unassigned), or None if every atom is assigned."""
+        while self.heap:
+            v = self._pop()
+            if values[v << 1] == 0:
+                phase = self.phases[v]
+                if not self.phase_saving or phase == _NO_PHASE:
+                    phase = 0 if self.weights[v << 1] >= self.weights[v << 1 | 1] else 1
+                return v << 1 | phase
+        return None
+    # end def
+
+    def _push(self, v: int):
+        self.positions[v] = len(self.heap)
+        self.heap.append(v)
+        self._increased(v)
+    # end def
+
+    def _increased(self, v: int):
+        """Moves v up the heap after its score increased."""
+        heap, positions, scores = self.heap, self.positions, self.scores
+        position = positions[v]
+        if position < 0:
+            return
+        score = scores[v]
+        while position > 0:
+            parent = (position - 1) >> 1
+            above = heap[parent]
+            if scores[above] > score or scores[above] == score and above < v:
+                break
+            heap[position] = heap[parent]
+            positions[heap[position]] = position
+            position = parent
+        heap[position] = v
+        positions[v] = position
+    # end def
+
+    def _pop(self) -> int:
+        heap, positions, scores = self.heap, self.positions, self.scores
+        top = heap[0]
+        positions[top] = -1
+        last = heap.pop()
+        if not heap:
+            return top
+        score = scores[last]
+        position = 0
+        while True:
+            child = 2 * position + 1
+            if child >= len(heap):
+                break
+            if child + 1 < len(heap):
+                left, right = heap[child], heap[child + 1]
+                if scores[right] > scores[left] or scores[right] == scores[left] and right < left:
+                    child += 1
+            below = heap[child]
+            if scores[below] < score or scores[below] == score and below > last:
+                break
+            heap[position] = heap[child]
+            positions[heap[position]] = position
+            position = child
+        heap[position] = last
+        positions[last] = position
+        return top
+    # end def
+# end class BranchingHeuristic
+
+
+class StaticMaxOccurrences(BranchingHeuristic):
+    """
+    Scores an atom by the number of occurrences of its most frequent literal in all the clauses given to the
+    solver, satisfied or not. It is the static counterpart of DLIS.
+    """
+
+    def score(self, v: int):
+        return max(self.weights[v << 1], self.weights[v << 1 | 1])
+    # end def
+# end class StaticMaxOccurrences
+
+
+class StaticJeroslowWang(BranchingHeuristic):
+    """
+    Scores an atom by the sum of 2 ** -len(clause) over the clauses given to the solver where it occurs, so atoms
+    of short clauses, which are closer to propagating, come first (two-sided Jeroslow-Wang).
+    """
+
+    def weight(self, size: int):
+        return 2.0 ** -size
+    # end def
+# end class StaticJeroslowWang
+
+
+class VariableStateIndependentDecayingSum(BranchingHeuristic):
+    """
+    Scores an atom by its occurrences in the clauses given to the solver, plus one for each clause learned with it.
+    Every decay_interval conflicts, all scores are halved, which leaves the heap ordered.
+    """
+
+    def __init__(self, phase_saving: bool = True, decay_interval: int = 256):
+        super().__init__(phase_saving)
+        self.decay_interval = decay_interval
+        self.conflicts = 0
+    # end def
+
+    def score(self, v: int):
+        # occurrences are added to the score, which keeps the bumps of conflicts
+        return self.scores[v] + 1
+    # end def
+
+    def conflict(self, involved: list, learned: list):
+        scores = self.scores
+        for code in learned:
+            scores[code >> 1] += 1
+            self._increased(code >> 1)
+        self.conflicts += 1
+        if self.conflicts % self.decay_interval == 0:
+            for v in range(1, len(scores)):
+                scores[v] /= 2
+    # end def
+# end class VariableStateIndependentDecayingSum
+
+
+class ExponentialVSIDS(BranchingHeuristic):
+    """
+    Adds increment to the score of every atom met while analyzing a conflict, then divides increment by decay
+    (below 1). Recent conflicts thus weigh more, without touching old scores, except to rescale all of them
+    when they grow too large, which leaves the heap ordered.
+    """
+
+    def __init__(self, phase_saving: bool = True, decay: float = 0.95):
+        super().__init__(phase_saving)
+        self.decay = decay
+        self.increment = 1.0
+    # end def
+
+    def score(self, v: int):
+        # scores start at 0 and only grow with conflicts, occurrences only give the truth value of new atoms
+        return self.scores[v]
+    # end def
+
+    def conflict(self, involved: list, learned: list):
+        scores, increment = self.scores, self.increment
+        for v in involved:
+            scores[v] += increment
+            self._increased(v)
+        self.increment /= self.decay
+        if self.increment > 1e100:
+            for v in range(1, len(scores)):
+                scores[v] *= 1e-100
+            self.increment *= 1e-100
+    # end def
+# end class ExponentialVSIDS
+
+
+HEURISTICS = {MAX_OCCURRENCES: StaticMaxOccurrences, JEROSLOW_WANG: StaticJeroslowWang,
+              VSIDS: VariableStateIndependentDecayingSum, EVSIDS: ExponentialVSIDS}
+
+
+def branching_heuristic(name: str, phase_saving: bool = True) -> BranchingHeuristic:
+    """Returns a new heuristic of the kind given by name (max_occurrences, jeroslow_wang, vsids or evsids)."""
+    if name not in HEURISTICS:
+        raise ValueError(f"unknown heuristic {name!r}, expected one of {', '.join(map(repr, HEURISTICS))}")
+    return HEURISTICS[name](phase_saving)
@@ -0,0 +1,143 @@
+"""This module stores clause lists with integer literals, as SAT solvers do.
+
+A SymbolTable numbers atoms from 1 and maps them both ways, so a literal is a signed integer, as in the DIMACS
+CNF format (see dimacs.py): n stands for the atom number n and -n for its negation. A ClauseStore keeps all the
+literals of its clauses in one array('i'), with the offset where each clause starts in another, the same layout
+as the clause files of serialization.py. Algorithms on clauses work on integers, and formulas are only built
+back when results leave them, through the symbol table. Clauses already numbered, as in DIMACS files or clause
+files, are stored with their own numbers (see from_literals).
+
+For example, the piece of code below stores (p ∨ ¬q) ∧ q.
+
+store = ClauseStore()
+store.add({Atom('p'), Not(Atom('q'))})
+store.add({Atom('q')})
+list(store)  # [[1, -2], [2]]
+"""
+
+from array import array
+from formula import Formula, Atom, Not
+
+
+class SymbolTable:
+    """
+    Numbers atoms from 1. numbers maps atoms to their numbers, and atoms[n] is the atom numbered n.
+    """
+
+    def __init__(self):
+        self.numbers = {}
+        self.atoms = [None]
+    # end def
+
+    def __len__(self):
+        return len(self.atoms) - 1
+    # end def
+
+    def number(self, atom: Atom) -> int:
+        """Returns the number of atom, giving it the next number if it has none."""
+        number = self.numbers.get(atom)
+        if number is None:
+            number = self.numbers[atom] = len(self.atoms)
+            self.atoms.append(atom)
+        return number
+    # end def
+
+    def fresh(self, kind: str) -> Atom:
+        """Returns a new atom, already numbered, for an auxiliary variable of some kind (such as the atoms of a
+        Tseitin encoding). Its name is the tuple (kind, number), which never clashes with the names of the atoms
+        written by users, and tells auxiliary atoms apart (see is_auxiliary)."""
+        atom = Atom((kind, len(self.atoms)))
+        self.number(atom)
+        return atom
+    # end def
+
+    def literal(self, literal: Formula) -> int:
+        """Returns the integer of a literal (an atom or a negated atom)."""
+        if isinstance(literal, Not):
+            return -self.number(literal.inner)
+        return self.number(literal)
+    # end def
+
+    def formula(self, literal: int) -> Formula:
+        """Returns the literal (an atom or a negated atom) of an integer."""
+        return self.atoms[literal] if literal > 0 else Not(self.atoms[-literal])
+    # end def
+
+    def interpretation(self, literals) -> dict:
+        """Returns the interpretation making true the integer literals given, as a dict from atoms to truth values."""
+        return {self.atoms[abs(literal)]: literal > 0 for literal in literals}
+    # end def
+# end class SymbolTable
+
+
+def is_auxiliary(atom: Atom) -> bool:
+    """Checks whether atom was made by SymbolTable.fresh."""
+    return isinstance(atom.name, tuple)
+
+
+class ClauseStore:
+    """
+    A clause list over integer literals. The literals of clause i are literals[offsets[i]:offsets[i + 1]],
+    and symbols translates them back to formulas.
+    """
+
+    def __init__(self, symbols: SymbolTable = None):
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.literals = array('i')
+        self.offsets = array('i', [0])
+    # end def
+
+    @classmethod
+    def from_clauses(cls, clauses: list[set[Formula]], symbols: SymbolTable = None):
+        """Builds a store from a clause list as used by the dpll module."""
+        store = cls(symbols)
+        for clause in clauses:
+            store.add(clause)
+        return store
+    # end def
+
+    @classmethod
+    def from_literals(cls, clauses, atom_names: list = None):
+        """Builds a store from clauses of integer literals, such as the clauses of dimacs.iter_dimacs, keeping
+        their numbers. The atom numbered n is Atom(atom_names[n - 1]), or Atom(str(n)) if atom_names is None,
+        as in dimacs.read_dimacs."""
+        store = cls()
+        for clause in clauses:
+            store.add_literals(clause)
+        count = max(len(atom_names) if atom_names is not None else 0, max(map(abs, store.literals), default=0))
+        for number in range(1, count + 1):
+            store.symbols.number(Atom(atom_names[number - 1] if atom_names is not None else str(number)))
+        return store
+    # end def
+
+    def __len__(self):
+        return len(self.offsets) - 1
+    # end def
+
+    def __iter__(self):
+        literals, offsets = self.literals, self.offsets
+        for index in range(len(offsets) - 1):
+            yield literals[offsets[index]:offsets[index + 1]].tolist()
+    # end def
+
+    def add(self, clause):
+        """Adds a clause given as an iterable of literal formulas."""
+        self.add_literals(self.symbols.literal(literal) for literal in clause)
+    # end def
+
+    def add_literals(self, clause):
+        """Adds a clause given as an iterable of integer literals, whose atoms must be in symbols."""
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+    # end def
+
+    def clause(self, index: int) -> list[int]:
+        return self.literals[self.offsets[index]:self.offsets[index + 1]].tolist()
+    # end def
+
+    def clauses(self) -> list[set[Formula]]:
+        """Builds the clause list used by the dpll module."""
+        formula = self.symbols.formula
+        return [{formula(literal) for literal in clause} for clause in self]
+    # end def
+# end class ClauseStore
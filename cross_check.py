@@ -0,0 +1,129 @@
+"""Cross-checks the solvers and file formats against brute force over small random formulas.
+Run it as python cross_check.py: it stops at the first disagreement and prints the formula that caused it."""
+
+import io
+import os
+import pickle
+import random
+import tempfile
+from itertools import product
+from formula import *
+from functions import atoms
+from dpll import sat_dpll, sat_clauses, arena_sat_dpll, CDCL, DPLL, CNF, TSEITIN, PLAISTED_GREENBAUM
+from branching import HEURISTICS, DLIS
+from arena import FormulaArena
+from semantics import truth_value, iter_models
+from model_counting import count_models
+from dimacs import read_dimacs, read_dimacs_store, write_dimacs
+from serialization import save_clauses, load_clauses
+from clause_store import ClauseStore
+
+
+def random_formula(atoms_list: list, depth: int, rng: random.Random) -> Formula:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(atoms_list)
+    kind = rng.randrange(6)
+    if kind == 0:
+        return Not(random_formula(atoms_list, depth - 1, rng))
+    operands = [random_formula(atoms_list, depth - 1, rng) for _ in range(rng.randrange(1, 4) if kind > 3 else 2)]
+    return (And, Or, Implies, BigAnd, BigOr)[kind - 1](*operands)
+# end def
+
+
+def brute_force_models(formula: Formula, atoms_list: list) -> set:
+    """The models of formula over atoms_list, as tuples of truth values."""
+    return {values for values in product([False, True], repeat=len(atoms_list))
+            if truth_value(formula, dict(zip(atoms_list, values)))}
+# end def
+
+
+def clauses_satisfiable(clauses: list[set[Formula]]) -> bool:
+    """Brute-force satisfiability of a clause list, as used by the dpll module."""
+    clause_atoms = sorted({literal.inner if isinstance(literal, Not) else literal
+                           for clause in clauses for literal in clause}, key=str)
+    return bool(brute_force_models(BigAnd(*[BigOr(*clause) for clause in clauses]), clause_atoms)) \
+        if clauses else True
+# end def
+
+
+def check_solvers(formula: Formula, satisfiable: bool):
+    for encoding in (CNF, TSEITIN, PLAISTED_GREENBAUM):
+        for heuristic in (None, *HEURISTICS):
+            assert sat_dpll(formula, CDCL, encoding, heuristic) == satisfiable, (formula, encoding, heuristic)
+        for heuristic in (None, DLIS):
+            assert sat_dpll(formula, DPLL, encoding, heuristic) == satisfiable, (formula, encoding, heuristic)
+        arena = FormulaArena()
+        assert arena_sat_dpll(arena, arena.add(formula), CDCL, encoding) == satisfiable, (formula, encoding)
+# end def
+
+
+def check_models(formula: Formula, atoms_list: list, models: set):
+    found = [tuple(model[atom] for atom in atoms_list) for model in iter_models(formula)]
+    assert len(found) == len(set(found)) and set(found) == models, formula
+    assert count_models(formula) == len(models), formula
+    projection = atoms_list[:2]
+    projected = {values[:2] for values in models}
+    found = [tuple(model[atom] for atom in projection) for model in iter_models(formula, projection)]
+    assert len(found) == len(set(found)) and set(found) == projected, formula
+    assert count_models(formula, projection) == len(projected), formula
+# end def
+
+
+def check_files(clauses: list[set[Formula]], directory: str):
+    satisfiable = clauses_satisfiable(clauses)
+    for written in (clauses, iter(clauses), (set(clause) for clause in clauses), ClauseStore.from_clauses(clauses)):
+        text = io.StringIO()
+        write_dimacs(written, text)
+        text.seek(0)
+        assert len(read_dimacs(io.StringIO(text.getvalue()))) == len(clauses), clauses
+        assert sat_clauses(read_dimacs_store(text)) == satisfiable, clauses
+    path = os.path.join(directory, 'clauses.cnf')
+    write_dimacs(clauses, path)
+    assert sat_clauses(read_dimacs(path)) == satisfiable, clauses
+    path = os.path.join(directory, 'clauses.bin')
+    save_clauses(path, clauses)
+    stored = load_clauses(path)
+    assert len(stored) == len(clauses) and sat_clauses(stored.clause_store()) == satisfiable, clauses
+    assert clauses_satisfiable(stored.clauses()) == satisfiable, clauses
+# end def
+
+
+def check_pickling(formula: Formula):
+    assert pickle.loads(pickle.dumps(formula)) is formula, formula
+# end def
+
+
+def check_deep_clause(size: int = 20000):
+    """A clause too deep for recursion, written as nested binary Or, must still be encoded."""
+    clause = Atom('x0')
+    for i in range(1, size):
+        clause = Or(clause, Not(Atom(f'x{i}')) if i % 2 else Atom(f'x{i}'))
+    assert sat_dpll(clause, encoding=TSEITIN)
+    assert sat_dpll(And(clause, BigAnd(*[Not(Atom(f'x{i}')) if i % 2 == 0 else Atom(f'x{i}')
+                                         for i in range(size)])), encoding=TSEITIN) is False
+# end def
+
+
+def cross_check(rounds: int = 300, seed: int = 0):
+    rng = random.Random(seed)
+    atoms_list = [Atom(name) for name in 'pqrst']
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(rounds):
+            formula = random_formula(atoms_list, 4, rng)
+            formula_atoms = sorted(atoms(formula), key=str)
+            models = brute_force_models(formula, formula_atoms)
+            check_solvers(formula, bool(models))
+            check_models(formula, formula_atoms, models)
+            clauses = [set(rng.sample(atoms_list, rng.randrange(1, 4))) for _ in range(rng.randrange(1, 8))]
+            clauses = [{Not(atom) if rng.random() < 0.5 else atom for atom in clause} for clause in clauses]
+            check_files(clauses, directory)
+            check_pickling(formula)
+    check_pickling(BigAnd(*atoms_list))
+    check_pickling(BigOr(Not(atoms_list[0]), BigAnd(*atoms_list[1:])))
+    check_deep_clause()
+# end def
+
+
+if __name__ == '__main__':
+    cross_check()
+    print('all checks passed')
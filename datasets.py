@@ -0,0 +1,104 @@
+"""This module evaluates formulas over binarized tabular datasets, such as the csv files shipped with the
+repository, where every feature column holds 0 or 1 and an atom stands for the column with the same name.
+
+Each column is packed into an integer used as a bit vector (bit i is the value at row i), so a formula is
+evaluated on all rows at once with bitwise operations instead of one interpretation per row.
+
+For example, the piece of code below counts the rows of the iris dataset covered by a rule and how many
+of them are setosa.
+
+iris = load_binarized_csv('iris_features_binarized_setosa_others.csv')
+rule = And(Atom('petal length (cm) <= 1.5'), Not(Atom('sepal width (cm) <= 2.7')))
+rule_statistics(rule, iris, iris.classes['setosa'])
+"""
+
+import csv
+from typing import NamedTuple
+from formula import Formula
+from functions import atoms
+from semantics import compile_formula
+
+
+class BinaryDataset:
+    """
+    A column-oriented binarized dataset. columns maps each feature name to the bit vector of that
+    column, and classes maps each value of the class column to the bit vector of the rows having it.
+    """
+
+    def __init__(self, rows: int, columns: dict, classes: dict = None):
+        self.rows = rows
+        self.columns = columns
+        self.classes = classes or {}
+        self.mask = (1 << rows) - 1
+    # end def
+
+    @classmethod
+    def from_columns(cls, columns: dict, classes: list = None):
+        """Builds a dataset from sequences of truth values (or 0/1), one per column, and optionally
+        the list with the class of each row."""
+        rows = len(next(iter(columns.values()))) if columns else len(classes or [])
+        packed = {name: pack_bits(values) for name, values in columns.items()}
+        by_class = {}
+        for value in set(classes or []):
+            by_class[value] = pack_bits([row_class == value for row_class in classes])
+        return cls(rows, packed, by_class)
+    # end def
+# end class BinaryDataset
+
+
+def pack_bits(values) -> int:
+    """Packs a sequence of truth values into an integer whose bit i is values[i]."""
+    return int('0' + ''.join('1' if value else '0' for value in reversed(values)), 2)
+
+
+def unpack_bits(bits: int, rows: int) -> list[bool]:
+    """Returns the list of the first rows bits of an integer, from bit 0 upwards."""
+    return [digit == '1' for digit in reversed(format(bits, 'b').zfill(rows)[-rows:])] if rows else []
+
+
+def load_binarized_csv(path: str, class_column: str = 'class') -> BinaryDataset:
+    """Reads a binarized csv file with a header line. Every column but class_column must hold 0 or 1."""
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        table = list(zip(*reader))
+    columns, classes = {}, None
+    for name, values in zip(header, table):
+        if name == class_column:
+            classes = list(values)
+        else:
+            columns[name] = [value.strip() == '1' for value in values]
+    return BinaryDataset.from_columns(columns, classes)
+
+
+def evaluate_rows(formula: Formula, dataset: BinaryDataset) -> int:
+    """Returns the bit vector of the rows of dataset where formula is true."""
+    atoms_list = list(atoms(formula))
+    evaluate = compile_formula(formula, atoms_list, bitwise=True)
+    return evaluate([dataset.columns[atom.name] for atom in atoms_list], dataset.mask)
+
+
+def truth_values(formula: Formula, dataset: BinaryDataset) -> list[bool]:
+    """Returns the truth value of formula at every row of dataset."""
+    return unpack_bits(evaluate_rows(formula, dataset), dataset.rows)
+
+
+class RuleStatistics(NamedTuple):
+    covered: int
+    coverage: float
+    true_positives: int
+    false_positives: int
+    false_negatives: int
+    true_negatives: int
+
+
+def rule_statistics(formula: Formula, dataset: BinaryDataset, positives: int) -> RuleStatistics:
+    """Evaluates formula as a rule predicting the rows in the bit vector positives (for instance,
+    dataset.classes['setosa']), and counts the rows it covers and its true/false positives/negatives."""
+    covered = evaluate_rows(formula, dataset)
+    covered_count = covered.bit_count()
+    true_positives = (covered & positives).bit_count()
+    false_negatives = positives.bit_count() - true_positives
+    false_positives = covered_count - true_positives
+    return RuleStatistics(covered_count, covered_count / dataset.rows if dataset.rows else 0.0, true_positives,
+                          false_positives, false_negatives, dataset.rows - covered_count - false_negatives)
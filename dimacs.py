@@ -0,0 +1,150 @@
+"""This module reads and writes formulas in conjunctive normal form in the DIMACS CNF format,
+the standard input format of SAT solvers. For example, the file below describes (1 ∨ ¬3) ∧ (2 ∨ 3 ∨ ¬1).
+
+c an example
+p cnf 3 2
+1 -3 0
+2 3 -1 0
+
+Files are processed line by line, so large instances are handled with bounded memory and
+no formula tree is built for the whole CNF. The variable n is read as the atom Atom('n').
+"""
+
+import os
+from formula import Formula, Not, And, Or, BigAnd, BigOr
+from functions import is_literal
+from clause_store import ClauseStore
+
+
+def iter_dimacs(file):
+    """Yields the clauses of a DIMACS CNF file, one list of integer literals at a time.
+    file may be a path (str or os.PathLike) or an open text file. Clauses may span several lines."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file) as opened:
+            yield from iter_dimacs(opened)
+        return
+    clause = []
+    for line in file:
+        line = line.strip()
+        if not line or line[0] in 'cp':
+            continue
+        if line[0] == '%':
+            break
+        for token in line.split():
+            literal = int(token)
+            if literal == 0:
+                yield clause
+                clause = []
+            else:
+                clause.append(literal)
+    if clause:
+        yield clause
+
+
+def read_dimacs(file) -> list[set[Formula]]:
+    """Reads a DIMACS CNF file straight into the clause list used by the dpll module."""
+    return read_dimacs_store(file).clauses()
+
+
+def read_dimacs_store(file) -> ClauseStore:
+    """Reads a DIMACS CNF file into a ClauseStore, where the variable n keeps the number n."""
+    return ClauseStore.from_literals(iter_dimacs(file))
+
+
+def write_dimacs(cnf, file) -> dict:
+    """Writes a clause list (as used by the dpll module), a ClauseStore or a formula in CNF to a DIMACS CNF
+    file. file may be a path (str or os.PathLike) or an open text file. The integer literals of a ClauseStore
+    are written as they are. Otherwise, atoms are numbered in order of first occurrence. The mapping from atoms
+    to numbers is returned. The clauses are walked twice (once to count them, once to write them), and never
+    collected in memory. An iterator of clauses, such as a generator, can only be walked once: it is written in
+    a single pass after a header of fixed width, which is filled in at the end, so file must then be seekable."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'w') as opened:
+            return write_dimacs(cnf, opened)
+    if isinstance(cnf, ClauseStore):
+        file.write(_header(len(cnf.symbols), len(cnf)))
+        for clause in cnf:
+            clause.append(0)
+            file.write(' '.join(map(str, clause)) + '\n')
+        return dict(cnf.symbols.numbers)
+    numbers = {}
+    if not isinstance(cnf, Formula) and iter(cnf) is cnf:
+        if not file.seekable():
+            raise TypeError("an iterator of clauses can only be written to a seekable file")
+        start = file.tell()
+        file.write(_header(0, 0, _HEADER_WIDTH))
+        clauses = 0
+        for clause in _clauses(cnf):
+            clauses += 1
+            file.write(_line(clause, numbers))
+        end = file.tell()
+        file.seek(start)
+        file.write(_header(len(numbers), clauses, _HEADER_WIDTH))
+        file.seek(end)
+        return numbers
+    clauses = 0
+    for clause in _clauses(cnf):
+        clauses += 1
+        for literal in clause:
+            atom = literal.inner if isinstance(literal, Not) else literal
+            if atom not in numbers:
+                numbers[atom] = len(numbers) + 1
+    file.write(_header(len(numbers), clauses))
+    for clause in _clauses(cnf):
+        file.write(_line(clause, numbers))
+    return numbers
+
+
+# width of the numbers in the header written before the clauses are counted
+_HEADER_WIDTH = 20
+
+def _header(variables: int, clauses: int, width: int = 0) -> str:
+    return f"p cnf {variables:>{width}} {clauses:>{width}}\n"
+
+
+def _line(clause, numbers: dict) -> str:
+    """Returns the line of a clause of literal formulas, numbering the atoms not yet in numbers."""
+    line = []
+    for literal in clause:
+        atom = literal.inner if isinstance(literal, Not) else literal
+        if atom not in numbers:
+            numbers[atom] = len(numbers) + 1
+        line.append(str(-numbers[atom]) if isinstance(literal, Not) else str(numbers[atom]))
+    line.append('0\n')
+    return ' '.join(line)
+
+
+def _clauses(cnf):
+    """Yields the clauses of a clause list, or of a formula in CNF, as iterables of literals."""
+    if not isinstance(cnf, Formula):
+        for clause in cnf:
+            for literal in clause:
+                _check_literal(literal)
+            yield clause
+        return
+    conjuncts = [cnf]
+    while conjuncts:
+        conjunct = conjuncts.pop()
+        if isinstance(conjunct, And):
+            conjuncts.append(conjunct.right)
+            conjuncts.append(conjunct.left)
+        elif isinstance(conjunct, BigAnd):
+            conjuncts.extend(reversed(conjunct.formulas))
+        else:
+            clause, disjuncts = [], [conjunct]
+            while disjuncts:
+                disjunct = disjuncts.pop()
+                if isinstance(disjunct, Or):
+                    disjuncts.append(disjunct.right)
+                    disjuncts.append(disjunct.left)
+                elif isinstance(disjunct, BigOr):
+                    disjuncts.extend(reversed(disjunct.formulas))
+                else:
+                    clause.append(_check_literal(disjunct))
+            yield clause
+
+
+def _check_literal(literal: Formula) -> Formula:
+    if not is_literal(literal):
+        raise ValueError(f"{literal} is not a literal, so the input is not in CNF")
+    return literal
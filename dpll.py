@@ -1,40 +1,98 @@
-from formula import Formula, Not, Or, And, Implies, Atom
-from functions import is_cnf
+from formula import Formula, Not, Or, And, Implies, Atom, BigAnd, BigOr
+from functions import distinct_postorder, immediate_subformulas
+from arena import FormulaArena, ATOM, NOT, IMPLIES, AND, OR, BIG_AND, BIG_OR
+from clause_store import SymbolTable, ClauseStore
+from branching import DLIS, EVSIDS, branching_heuristic
 
-def sat_dpll(f: Formula):
-    f = to_cnf(f) if not is_cnf(f) else f
-    clauses = pure_literal_elimination(unit_propagate(get_clauses_list(f)))
-    return dpll(clauses)
+# backends of sat_dpll
+CDCL, DPLL = 'cdcl', 'dpll'
+# encodings of formulas into clauses
+CNF, TSEITIN, PLAISTED_GREENBAUM = 'cnf', 'tseitin', 'plaisted_greenbaum'
 
-def dpll(clauses: list[set[Formula]]) -> bool:
+def sat_dpll(f: Formula, backend: str = CDCL, encoding: str = CNF, heuristic: str = None):
+    """Checks whether f is satisfiable, with the CDCL Solver (the default) or the recursive dpll function.
+    f is converted to clauses with to_cnf (the default), or in linear size with the tseitin or
+    plaisted_greenbaum encoding (see clause_store_of). heuristic names the branching heuristic of the
+    Solver (see branching.py), evsids if None. The dpll function always branches on the literal with most
+    occurrences, so it only accepts None or dlis."""
+    return sat_clauses(clause_store_of([f], encoding=encoding), backend, heuristic)
+
+def arena_sat_dpll(arena: FormulaArena, root: int, backend: str = CDCL, encoding: str = CNF,
+                   heuristic: str = None):
+    """sat_dpll for the formula stored in arena at node root, whose clauses are found on the arena arrays
+    without building a formula tree (see arena_clause_store). The conjuncts of the formula that are clauses are
+    read as they are. The others are encoded in linear size, with the tseitin encoding if encoding is tseitin,
+    and with the plaisted_greenbaum encoding otherwise, as converting them to CNF would need formula objects."""
+    _check_encoding(encoding)
+    return sat_clauses(arena_clause_store(arena, root, polarity_aware=encoding != TSEITIN), backend, heuristic)
+
+def sat_clauses(clauses, backend: str = CDCL, heuristic: str = None) -> bool:
+    """Checks whether a clause list, or a ClauseStore, is satisfiable."""
+    store = clauses if isinstance(clauses, ClauseStore) else ClauseStore.from_clauses(clauses)
+    if backend == CDCL:
+        return Solver(store, heuristic or EVSIDS).solve()
+    if backend != DPLL:
+        raise ValueError(f"unknown backend {backend!r}, expected {CDCL!r} or {DPLL!r}")
+    if heuristic not in (None, DLIS):
+        raise ValueError(f"the {DPLL!r} backend only branches with {DLIS!r}, not {heuristic!r}")
+    return dpll(pure_literal_elimination(unit_propagate([set(clause) for clause in store])))
+
+def clauses_of(formulas: list[Formula]) -> list[set[Formula]]:
+    """Returns the clause list of the conjunction of formulas. Each formula is converted to CNF on its own,
+    so the clauses of a long list of premises are found without distributing over the whole conjunction."""
+    clauses = []
+    for f in formulas:
+        clauses.extend(cnf_clauses(f))
+    return clauses
+
+def clause_store_of(formulas: list[Formula], symbols: SymbolTable = None, encoding: str = CNF) -> ClauseStore:
+    """Returns the clauses of the conjunction of formulas as integer literals in a ClauseStore.
+    With the cnf encoding, they are the clauses of clauses_of, equivalent to the formulas. With the tseitin and
+    plaisted_greenbaum encodings, they come from a TseitinEncoder: they have new atoms and are only
+    equisatisfiable with the formulas, but their size is linear in the size of the formulas."""
+    if encoding == CNF:
+        return ClauseStore.from_clauses(clauses_of(formulas), symbols)
+    _check_encoding(encoding)
+    encoder = TseitinEncoder(ClauseStore(symbols), polarity_aware=encoding == PLAISTED_GREENBAUM)
+    for f in formulas:
+        encoder.add(f)
+    return encoder.store
+
+def _check_encoding(encoding: str):
+    if encoding not in (CNF, TSEITIN, PLAISTED_GREENBAUM):
+        raise ValueError(f"unknown encoding {encoding!r}, expected {CNF!r}, {TSEITIN!r} or {PLAISTED_GREENBAUM!r}")
+
+# the functions below work on clauses of integer literals (see clause_store.py)
+
+def dpll(clauses: list[set[int]]) -> bool:
+    clauses = unit_propagate(clauses)
     if not clauses:
         return True 
     if any(clause == set() for clause in clauses):
         return False
     literal = choose_literal(clauses)
-    return dpll(
-        [clause for clause in clauses if literal not in clause]
-    ) or dpll(
-        [clause for clause in clauses if negate(literal) not in clause]
-    )
+    return dpll(assign(clauses, literal)) or dpll(assign(clauses, -literal))
 
-def unit_propagate(clauses: list[set[Formula]]) -> list[set[Formula]]:
+def assign(clauses: list[set[int]], literal: int) -> list[set[int]]:
+    """Simplifies clauses when literal is true: the clauses with literal are satisfied, and its negation
+    is removed from the others."""
+    return [clause - {-literal} if -literal in clause else clause for clause in clauses if literal not in clause]
+
+def unit_propagate(clauses: list[set[int]]) -> list[set[int]]:
     while True:
         unit_clauses = [clause for clause in clauses if len(clause) == 1]
         if not unit_clauses:
             break
         unit_literal = next(iter(unit_clauses[0]))
-        clauses = [clause - {negate(unit_literal)} for clause in clauses if unit_literal not in clause]
+        clauses = assign(clauses, unit_literal)
     return clauses
 
-def pure_literal_elimination(clauses: list[set[Formula]]) -> list[set[Formula]]:
+def pure_literal_elimination(clauses: list[set[int]]) -> list[set[int]]:
     all_literals = {literal for clause in clauses for literal in clause}
-    pure_literals = {literal for literal in all_literals if negate(literal) not in all_literals}
-    for pure_literal in pure_literals:
-        clauses = [clause for clause in clauses if pure_literal not in clause]
-    return clauses
+    pure_literals = {literal for literal in all_literals if -literal not in all_literals}
+    return [clause for clause in clauses if pure_literals.isdisjoint(clause)]
 
-def choose_literal(clauses: list[set[Formula]]) -> Formula:
+def choose_literal(clauses: list[set[int]]) -> int:
     literal_counts = {}
     for clause in clauses:
         for literal in clause:
@@ -47,95 +105,689 @@ def negate(f: Formula) -> Formula:
     return Not(f)
 
 def to_cnf(f: Formula) -> Formula:
-    formula = replace_implies(f)
-    while can_de_morgan(formula):
-        formula = de_morgan(formula)
-    formula = double_neg_remove(formula)
-    while not is_cnf(formula):
-        formula = distribute(formula)
-    return formula
-
-def can_de_morgan(f: Formula) -> bool:
-    if isinstance(f, Not):
-        if isinstance(f.inner, (And, Or)):
-            return True
-        return False or can_de_morgan(f.inner)
-    if isinstance(f, (And, Or, Implies)):
-        return False or can_de_morgan(f.left) or can_de_morgan(f.right)
-    return False
-
-def replace_implies(f: Formula) -> Formula:
-    if isinstance(f, Implies):
-        return Or(Not(replace_implies(f.left)), replace_implies(f.right))
-    if isinstance(f, Not):
-        return Not(replace_implies(f.inner))
-    if isinstance(f, Or):
-        return Or(replace_implies(f.left), replace_implies(f.right))
-    if isinstance(f, And):
-        return And(replace_implies(f.left), replace_implies(f.right))
-    return f
-
-def de_morgan(f: Formula) -> Formula:
-    if isinstance(f, Not):
-        if isinstance(f.inner, And):
-            return Or(de_morgan(f.inner.left), Not(de_morgan(f.inner.right)))
-        if isinstance(f.inner, Or):
-            return And(Not(de_morgan(f.inner.left)), Not(de_morgan(f.inner.right)))
-        return Not(de_morgan(f.inner))
-    if isinstance(f, And):
-        return And(de_morgan(f.left), de_morgan(f.right))
-    if isinstance(f, Or):
-        return Or(de_morgan(f.left), de_morgan(f.right))
-    if isinstance(f, Implies):
-        return Implies(de_morgan(f.left), de_morgan(f.right))
-    return f
-
-def double_neg_remove(f: Formula) -> Formula:
-    if isinstance(f, Not):
-        if isinstance(f.inner, Not):
-            return double_neg_remove(f.inner.inner)
-        return Not(double_neg_remove(f.inner))
-    if isinstance(f, Or):
-        return Or(double_neg_remove(f.left), double_neg_remove(f.right))
-    if isinstance(f, And):
-        return And(double_neg_remove(f.left), double_neg_remove(f.right))
-    if isinstance(f, Implies):
-        return Implies(double_neg_remove(f.left), double_neg_remove(f.right))
-    return f
-
-def distribute(f: Formula) -> Formula:
-    if isinstance(f, Or):
-        if isinstance(f.left, And):
-            rd = distribute(f.right)
-            return And(Or(distribute(f.left.left), rd), Or(distribute(f.left.right), rd))
-        if isinstance(f.right, And):
-            ld = distribute(f.left)
-            return And(Or(ld, distribute(f.right.left)), Or(ld, distribute(f.right.right)))
-        return Or(distribute(f.left), distribute(f.right))
-    if isinstance(f, Not):
-        return Not(distribute(f.inner))
-    if isinstance(f, And):
-        return And(distribute(f.left), distribute(f.right))
-    if isinstance(f, Implies):
-        return Implies(distribute(f.left), distribute(f.right))
-    return f
+    """Returns a formula in CNF equivalent to f, built from the clauses of cnf_clauses. A valid formula has no
+    clause, and is returned as the tautological clause p ∨ ¬p over one of its atoms p."""
+    clauses = cnf_clauses(f)
+    if not clauses:
+        atom = next(node for node in distinct_postorder(f) if isinstance(node, Atom))
+        return Or(atom, Not(atom))
+    return BigAnd(*(BigOr(*clause) for clause in clauses))
+
+def cnf_clauses(f: Formula) -> list[set[Formula]]:
+    """Returns the clause list of a CNF equivalent to f. The conjuncts of f that are already clauses are read as
+    they are, only merging duplicate literals and dropping tautological clauses (with complementary literals).
+    The other conjuncts are converted together by _distributed_clauses. A clause subsumed by a clause of another
+    conjunct is dropped by _remove_subsumed_across, where the clauses read as they are count as one conjunct."""
+    read = set()
+    converted = []
+    pending = [f]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (And, BigAnd)):
+            pending.extend(immediate_subformulas(node))
+            continue
+        clause = _clause_literals(node)
+        if clause is None:
+            converted.append(node)
+        elif not any(negate(literal) in clause for literal in clause):
+            read.add(frozenset(clause))
+    groups = [frozenset(read)] + _distributed_clauses(converted)
+    return [set(clause) for clause in _remove_subsumed_across(groups)]
+
+def _distributed_clauses(roots: list[Formula]) -> list[frozenset]:
+    """Returns the clauses of a CNF equivalent to each formula of roots, found in one bottom-up pass over their
+    distinct subformulas. Chains of conjunctions (or disjunctions) are flattened first, so their inner nodes get
+    no clause set, and the clause sets of a subformula are released after its last parent is combined.
+    Negations are pushed down to the atoms and implications removed on the way: each subformula gets the
+    clauses of itself, of its negation or both, as needed by the polarities in which it occurs. Disjunctions are
+    distributed over conjunctions, dropping tautological clauses, and subsumed clauses (containing all the
+    literals of another clause) of each product, so the clause sets distributed over further disjunctions stay
+    small."""
+    children = {}
+    parents = {}
+    order = []
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if node is None:
+            order.append(stack.pop())
+            continue
+        if node in children:
+            continue
+        operands = children[node] = _flat_operands(node)
+        for operand in operands:
+            parents[operand] = parents.get(operand, 0) + 1
+        stack.append(node)
+        stack.append(None)
+        stack.extend(operands)
+    needed = _polarities(order, roots, POSITIVE, children)
+    kept = set(roots)
+    positive, negative = {}, {}
+    for node in order:
+        mask = needed[node]
+        operands = children[node]
+        if isinstance(node, Atom):
+            positive[node] = frozenset({frozenset({node})})
+            negative[node] = frozenset({frozenset({Not(node)})})
+        elif isinstance(node, Not):
+            if mask & POSITIVE:
+                positive[node] = negative[node.inner]
+            if mask & NEGATIVE:
+                negative[node] = positive[node.inner]
+        elif isinstance(node, Implies):
+            # A → B is ¬A ∨ B, and its negation is A ∧ ¬B
+            if mask & POSITIVE:
+                positive[node] = _clause_product([negative[node.left], positive[node.right]])
+            if mask & NEGATIVE:
+                negative[node] = _clause_union([positive[node.left], negative[node.right]])
+        else:
+            # the negation of a conjunction is the disjunction of the negated operands, and conversely
+            combine, combine_negated = ((_clause_union, _clause_product) if isinstance(node, (And, BigAnd))
+                                        else (_clause_product, _clause_union))
+            if mask & POSITIVE:
+                positive[node] = combine([positive[operand] for operand in operands])
+            if mask & NEGATIVE:
+                negative[node] = combine_negated([negative[operand] for operand in operands])
+        for operand in operands:
+            parents[operand] -= 1
+            if not parents[operand] and operand not in kept:
+                positive.pop(operand, None)
+                negative.pop(operand, None)
+    return [positive[root] for root in roots]
+
+def _flat_operands(f: Formula) -> list[Formula]:
+    """The immediate subformulas of f, where a conjunction (disjunction) has the operands of its whole chain of
+    nested conjunctions (disjunctions)."""
+    if isinstance(f, (And, BigAnd)):
+        return list(_operands(f, (And, BigAnd)))
+    if isinstance(f, (Or, BigOr)):
+        return list(_operands(f, (Or, BigOr)))
+    return list(immediate_subformulas(f))
+
+def _clause_union(clause_sets: list[frozenset]) -> frozenset:
+    """The clauses of the conjunction of CNFs given by their clause sets."""
+    return frozenset().union(*clause_sets)
+
+def _clause_product(clause_sets: list[frozenset]) -> frozenset:
+    """The clauses of the disjunction of CNFs given by their clause sets, by distributing it over their
+    conjunctions. The clause sets are tautology free, so a union of two clauses is tautological exactly when a literal of one is complementary to a literal of the other, and nothing has to
+    be checked when they have no atom in common."""
+    product = frozenset({frozenset()})
+    for clauses in sorted(clause_sets, key=len):
+        literals, other = _literals(product), _literals(clauses)
+        if literals.isdisjoint(other) and not any(negate(literal) in literals for literal in other):
+            product = frozenset(left | right for left in product for right in clauses)
+        else:
+            product = _remove_subsumed({
+                left | right for left in product for right in clauses
+                if not any(negate(literal) in left for literal in right)})
+    return product
+
+def _literals(clauses) -> set:
+    return {literal for clause in clauses for literal in clause}
+
+def _remove_subsumed(clauses) -> frozenset:
+    """Drops the clauses containing all the literals of another clause. A clause can only subsume the clauses
+    where its rarest literal occurs, so each clause is only compared with the occurrence list of that literal."""
+    if len(clauses) < 2:
+        return frozenset(clauses)
+    occurrences = {}
+    for clause in clauses:
+        for literal in clause:
+            occurrences.setdefault(literal, []).append(clause)
+    subsumed = set()
+    for clause in sorted(clauses, key=len):
+        if clause in subsumed:
+            # the clauses it subsumes are subsumed by the clause that subsumes it
+            continue
+        rarest = min(clause, key=lambda literal: len(occurrences[literal]))
+        for other in occurrences[rarest]:
+            if len(other) > len(clause) and clause <= other:
+                subsumed.add(other)
+    return frozenset(clause for clause in clauses if clause not in subsumed)
+
+def _remove_subsumed_across(groups: list[frozenset]) -> set:
+    """Returns the union of the clause sets in groups, without the clauses containing all the literals of a clause
+    of another group. Only the literals occurring in several groups are indexed, and a clause is only compared with
+    the clauses of other groups where its rarest literal occurs, so groups sharing no literal cost a single pass."""
+    union = set().union(*groups)
+    groups_of = {}
+    for group, clauses in enumerate(groups):
+        for literal in _literals(clauses):
+            groups_of[literal] = groups_of.get(literal, 0) + 1
+    shared = {literal for literal, count in groups_of.items() if count > 1}
+    if not shared:
+        return union
+    # occurrences[literal][group] lists the clauses of group where the shared literal occurs
+    occurrences = {literal: {} for literal in shared}
+    for group, clauses in enumerate(groups):
+        for clause in clauses:
+            for literal in shared.intersection(clause):
+                occurrences[literal].setdefault(group, []).append(clause)
+    subsumed = set()
+    for group, clauses in enumerate(groups):
+        for clause in clauses:
+            # a clause with a literal of its own group only cannot be contained in a clause of another group
+            if not clause or clause in subsumed or not clause <= shared:
+                continue
+            elsewhere = {literal: sum(len(others) for other_group, others in occurrences[literal].items()
+                                      if other_group != group) for literal in clause}
+            rarest = min(elsewhere, key=elsewhere.get)
+            for other_group, others in occurrences[rarest].items():
+                if other_group == group:
+                    continue
+                for other in others:
+                    if len(other) > len(clause) and clause <= other:
+                        subsumed.add(other)
+    return union - subsumed
 
 def get_clauses_list(f: Formula) -> list[set[Formula]]:
     return all_literals_from_cnf(all_clauses_from_cnf(f))
 
 def all_clauses_from_cnf(f: Formula) -> set[Formula]:
-    def acc_clauses(f: Formula, s: set[Formula]):
-        if isinstance(f, And):
-            return acc_clauses(f.left, s) | acc_clauses(f.right, s)
-        s.add(f)
-        return s
-    return acc_clauses(f, set())
+    return _operands(f, (And, BigAnd))
 
 def all_literals_from_cnf(clauses: set[Formula]) -> list[set[Formula]]:
-    def literals_in_clause(f: Formula, s: set[Formula]):
-        if isinstance(f, Or):
-            return literals_in_clause(f.left, s) | literals_in_clause(f.right, s)
-        s.add(f)
-        return s
-    return list(map(lambda x: literals_in_clause(x, set()), clauses))
+    return [_operands(clause, (Or, BigOr)) for clause in clauses]
+
+def _clause_literals(f: Formula):
+    """Returns the set of literals of f if f is a clause, otherwise None. Unlike is_clause, it stops at the first
+    operand of the disjunctions of f that is not a literal, without walking that operand."""
+    literals = set()
+    pending = [f]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (Or, BigOr)):
+            pending.extend(immediate_subformulas(node))
+        elif isinstance(node, Atom) or isinstance(node, Not) and isinstance(node.inner, Atom):
+            literals.add(node)
+        else:
+            return None
+    return literals
+
+def _operands(f: Formula, connectives: tuple) -> set[Formula]:
+    """Returns the formulas joined by nested connectives in f, with an explicit stack (as dimacs._clauses does),
+    so clauses and conjunctions of any depth are flattened without reaching Python's recursion limit."""
+    operands = set()
+    pending = [f]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, connectives):
+            pending.extend(immediate_subformulas(node))
+        else:
+            operands.add(node)
+    return operands
+
+
+# polarities in which a subformula occurs, as bit masks
+POSITIVE, NEGATIVE, BOTH = 1, 2, 3
+
+def _polarities(order: list[Formula], roots: list[Formula], polarity: int, children: dict) -> dict:
+    """Maps each subformula to the polarities in which it occurs, given the distinct subformulas of the formulas
+    in roots in post-order, the polarity of the roots, and the operands of each subformula in children."""
+    needed = dict.fromkeys(roots, polarity)
+    for node in reversed(order):
+        mask = needed[node]
+        flipped = (mask & POSITIVE) << 1 | (mask & NEGATIVE) >> 1
+        if isinstance(node, Not):
+            needed[node.inner] = needed.get(node.inner, 0) | flipped
+        elif isinstance(node, Implies):
+            needed[node.left] = needed.get(node.left, 0) | flipped
+            needed[node.right] = needed.get(node.right, 0) | mask
+        else:
+            for operand in children[node]:
+                needed[operand] = needed.get(operand, 0) | mask
+    return needed
+
+class TseitinEncoder:
+    """
+    Converts formulas into equisatisfiable clauses of linear size, written as integer literals to a ClauseStore.
+    Each distinct subformula that is not a literal gets one new atom, defined by clauses stating that the atom is
+    equivalent to the subformula (Tseitin encoding). With polarity_aware, only the direction of that equivalence
+    needed by the polarities in which the subformula occurs is written (Plaisted-Greenbaum encoding), which leaves
+    about half of the clauses. Subformulas are encoded once per encoder, so formulas added to the same encoder
+    share the atoms of their common subformulas.
+    """
+
+    def __init__(self, store: ClauseStore = None, polarity_aware: bool = True):
+        self.store = store if store is not None else ClauseStore()
+        self.symbols = self.store.symbols
+        self.polarity_aware = polarity_aware
+        # integer literal standing for each subformula encoded, and the polarities already defined for it
+        self.literals = {}
+        self.defined = {}
+        # polarities marked by _request and not yet defined
+        self.requested = {}
+    # end def
+
+    def add(self, f: Formula):
+        """Adds clauses that are satisfiable exactly when f is. The conjuncts of f that are clauses are written as
+        they are, and the other conjuncts are encoded together and each asserted by a unit clause."""
+        asserted = []
+        pending = [f]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, (And, BigAnd)):
+                pending.extend(immediate_subformulas(node))
+                continue
+            clause = _clause_literals(node)
+            if clause is not None:
+                self.store.add(clause)
+            else:
+                self._request(node, POSITIVE)
+                asserted.append(node)
+        self._define_requested()
+        for node in asserted:
+            self.store.add_literals([self._literal(node)])
+    # end def
+
+    def encode(self, f: Formula, polarity: int = POSITIVE) -> int:
+        """Writes the definitions of the subformulas of f and returns the integer literal standing for f.
+        polarity tells whether that literal will be used as true (POSITIVE), as false (NEGATIVE) or both."""
+        self._request(f, polarity)
+        self._define_requested()
+        return self._literal(f)
+    # end def
+
+    def _request(self, f: Formula, polarity: int):
+        """Marks the polarities of the subformulas of f that still need a definition, top-down. A subformula is
+        only descended into when it gets a polarity it did not have, so each one is visited at most twice over
+        the life of the encoder, and subformulas encoded by earlier calls are not walked again."""
+        requested, defined = self.requested, self.defined
+        stack = [(f, polarity if self.polarity_aware else BOTH)]
+        while stack:
+            node, mask = stack.pop()
+            while isinstance(node, Not):
+                node, mask = node.inner, (mask & POSITIVE) << 1 | (mask & NEGATIVE) >> 1
+            if isinstance(node, Atom):
+                continue
+            new = mask & ~defined.get(node, 0) & ~requested.get(node, 0)
+            if not new:
+                continue
+            requested[node] = requested.get(node, 0) | new
+            if isinstance(node, Implies):
+                stack.append((node.left, (new & POSITIVE) << 1 | (new & NEGATIVE) >> 1))
+                stack.append((node.right, new))
+            else:
+                stack.extend((operand, new) for operand in immediate_subformulas(node))
+    # end def
+
+    def _define_requested(self):
+        """Writes the definitions of the polarities marked by _request."""
+        store, defined, literal = self.store, self.defined, self._literal
+        for node, mask in self.requested.items():
+            if isinstance(node, Implies):
+                operands = [-literal(node.left), literal(node.right)]
+            else:
+                operands = [literal(operand) for operand in immediate_subformulas(node)]
+            _define(store, literal(node), operands, isinstance(node, (And, BigAnd)), mask)
+            defined[node] = defined.get(node, 0) | mask
+        self.requested = {}
+    # end def
+
+    def _literal(self, f: Formula) -> int:
+        """The integer literal standing for f, numbering a new atom for f if it has none yet."""
+        sign = 1
+        while isinstance(f, Not):
+            f, sign = f.inner, -sign
+        if isinstance(f, Atom):
+            return sign * self.symbols.number(f)
+        number = self.literals.get(f)
+        if number is None:
+            number = self.literals[f] = self.symbols.number(self.symbols.fresh('tseitin'))
+        return sign * number
+    # end def
+# end class TseitinEncoder
+
+def _define(store: ClauseStore, name: int, operands: list[int], conjunction: bool, polarities: int):
+    """Writes the clauses stating that the literal name implies (POSITIVE), or is implied by (NEGATIVE), the
+    conjunction (or disjunction) of the literals in operands."""
+    if conjunction:
+        if polarities & POSITIVE:
+            for operand in operands:
+                store.add_literals((-name, operand))
+        if polarities & NEGATIVE:
+            store.add_literals([name] + [-operand for operand in operands])
+    else:
+        if polarities & POSITIVE:
+            store.add_literals([-name] + operands)
+        if polarities & NEGATIVE:
+            for operand in operands:
+                store.add_literals((name, -operand))
+
+def arena_is_cnf(arena: FormulaArena, root: int) -> bool:
+    """is_cnf for the formula stored in arena at node root."""
+    return _arena_ranks(arena, arena.reachable(root))[root] >= _CONJUNCTION
+
+# ranks of arena nodes, as in functions.is_cnf
+_OTHER, _CONJUNCTION, _CLAUSE, _LITERAL = range(4)
+
+def _arena_ranks(arena: FormulaArena, nodes: list[int]) -> dict:
+    """Maps each node of nodes (in bottom-up order) to the best of _LITERAL, _CLAUSE and _CONJUNCTION it is."""
+    kinds, offsets, operands = arena.kinds, arena.offsets, arena.operands
+    ranks = {}
+    for index in nodes:
+        kind = kinds[index]
+        children = operands[offsets[index]:offsets[index + 1]]
+        if kind == ATOM:
+            ranks[index] = _LITERAL
+        elif kind == NOT:
+            ranks[index] = _LITERAL if kinds[children[0]] == ATOM else _OTHER
+        elif kind in (OR, BIG_OR):
+            ranks[index] = _CLAUSE if min(ranks[child] for child in children) >= _CLAUSE else _OTHER
+        elif kind in (AND, BIG_AND):
+            ranks[index] = _CONJUNCTION if min(ranks[child] for child in children) >= _CONJUNCTION else _OTHER
+        else:
+            ranks[index] = _OTHER
+    return ranks
+
+def _arena_operands(arena: FormulaArena, index: int, connectives: tuple) -> list[int]:
+    """The nodes joined by nested connectives (node kinds) at node index."""
+    kinds, offsets, operands = arena.kinds, arena.offsets, arena.operands
+    found, stack = [], [index]
+    while stack:
+        index = stack.pop()
+        if kinds[index] in connectives:
+            stack.extend(operands[offsets[index]:offsets[index + 1]])
+        else:
+            found.append(index)
+    return found
+
+def arena_clauses_list(arena: FormulaArena, root: int) -> list[set[Formula]]:
+    """get_clauses_list for a CNF formula stored in arena at node root.
+    Only the literals are built as formula objects."""
+    return arena_clause_store(arena, root).clauses()
+
+def arena_clause_store(arena: FormulaArena, root: int, symbols: SymbolTable = None,
+                       polarity_aware: bool = True) -> ClauseStore:
+    """Returns clauses that are satisfiable exactly when the formula stored in arena at node root is, as integer
+    literals in a ClauseStore. They are found on the arena arrays, building formula objects for the atoms only.
+    The conjuncts of the formula that are clauses are written as they are, so a CNF formula keeps its clauses,
+    and the other conjuncts are encoded as by a TseitinEncoder (with the same polarity_aware option)."""
+    store = ClauseStore(symbols)
+    symbols = store.symbols
+    kinds, offsets, operands = arena.kinds, arena.offsets, arena.operands
+    nodes = arena.reachable(root)
+    ranks = _arena_ranks(arena, nodes)
+    # integer literal of each literal node, then of each node encoded
+    literals = {}
+    for index in nodes:
+        if kinds[index] == ATOM:
+            literals[index] = symbols.number(Atom(arena.atom_names[operands[offsets[index]]]))
+        elif ranks[index] == _LITERAL:
+            literals[index] = -literals[operands[offsets[index]]]
+    needed = {}
+    asserted = []
+    for index in set(_arena_operands(arena, root, (AND, BIG_AND))):
+        if ranks[index] >= _CLAUSE:
+            store.add_literals([literals[leaf] for leaf in _arena_operands(arena, index, (OR, BIG_OR))])
+        else:
+            needed[index] = POSITIVE if polarity_aware else BOTH
+            asserted.append(index)
+    if not asserted:
+        return store
+    for index in reversed(nodes):
+        mask = needed.get(index)
+        if not mask or index in literals:
+            continue
+        flipped = (mask & POSITIVE) << 1 | (mask & NEGATIVE) >> 1
+        children = operands[offsets[index]:offsets[index + 1]]
+        kind = kinds[index]
+        for position, child in enumerate(children):
+            child_mask = flipped if kind == NOT or (kind == IMPLIES and position == 0) else mask
+            needed[child] = needed.get(child, 0) | child_mask
+    for index in nodes:
+        mask = needed.get(index)
+        if not mask or index in literals:
+            continue
+        children = operands[offsets[index]:offsets[index + 1]]
+        kind = kinds[index]
+        if kind == NOT:
+            literals[index] = -literals[children[0]]
+            continue
+        name = literals[index] = symbols.number(symbols.fresh('tseitin'))
+        if kind == IMPLIES:
+            _define(store, name, [-literals[children[0]], literals[children[1]]], False, mask)
+        else:
+            _define(store, name, [literals[child] for child in children], kind in (AND, BIG_AND), mask)
+    for index in asserted:
+        store.add_literals([literals[index]])
+    return store
+
+
+class Solver:
+    """
+    An incremental conflict-driven clause learning (CDCL) SAT solver. Clauses (sets of literals, as in the clause
+    lists of this module, or the integer clauses of a ClauseStore) are added once and kept, so the same solver can be
+    asked many times under different assumptions: literals taken as true for a single call. Clauses learned from
+    conflicts are kept across calls.
+
+    Atoms are numbered by a SymbolTable (shared with the ClauseStore the solver is built from, if any), and
+    internally the integer literal n has the code 2 * n, and -n the code 2 * n + 1, so code ^ 1 is the negation
+    of code. Unit propagation watches two literals of each clause: a clause is only visited when one of its watched
+    literals becomes false. Assigned literals are kept on a trail, split into decision levels. On a conflict, the
+    clause of the first unique implication point is learned, and the search jumps back to the highest level of the
+    other literals of that clause, where it propagates.
+
+    Decisions are chosen by a BranchingHeuristic (see branching.py) selected by the name heuristic
+    (max_occurrences, jeroslow_wang, vsids or evsids), which keeps the unassigned atoms in a heap ordered by score.
+    """
+
+    def __init__(self, clauses=(), heuristic: str = EVSIDS, phase_saving: bool = True):
+        self.symbols = clauses.symbols if isinstance(clauses, ClauseStore) else SymbolTable()
+        self.heuristic = branching_heuristic(heuristic, phase_saving)
+        self.clauses = []
+        self.learned = 0
+        self.ok = True
+        # after a satisfiable call, the integer literal of each atom in the model found, in order of atom numbers
+        self.assignment = None
+        # indexed by literal code
+        self.values = [0, 0]
+        self.watches = [[], []]
+        # indexed by atom number
+        self.levels = [0]
+        self.reasons = [None]
+        self.seen = bytearray(1)
+        self.trail = []
+        self.trail_limits = []
+        self.propagated = 0
+        if isinstance(clauses, ClauseStore):
+            for clause in clauses:
+                self.add_literals(clause)
+        else:
+            for clause in clauses:
+                self.add_clause(clause)
+    # end def
+
+    def _grow(self):
+        """Makes room for the atoms added to the symbol table."""
+        for _ in range(len(self.levels), len(self.symbols.atoms)):
+            self.values.extend((0, 0))
+            self.watches.extend(([], []))
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.seen.append(0)
+        self.heuristic.grow(len(self.symbols))
+    # end def
+
+    def add_clause(self, clause):
+        """Adds a clause of literal formulas. The solver must be at level 0, as it is outside of solve."""
+        self.add_literals([self.symbols.literal(literal) for literal in clause])
+    # end def
+
+    def add_literals(self, clause):
+        """Adds a clause of integer literals of the symbol table."""
+        codes = {literal << 1 if literal > 0 else -literal << 1 | 1 for literal in clause}
+        self._grow()
+        self.heuristic.clause_added(list(codes))
+        if not self.ok or any(code ^ 1 in codes or self.values[code] == 1 for code in codes):
+            return
+        codes = [code for code in codes if self.values[code] == 0]
+        if not codes:
+            self.ok = False
+        elif len(codes) == 1:
+            self._enqueue(codes[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self._attach(codes)
+    # end def
+
+    def add_formula(self, f: Formula):
+        """Adds the clauses of the CNF of f."""
+        for clause in clauses_of([f]):
+            self.add_clause(clause)
+    # end def
+
+    @property
+    def model(self) -> dict:
+        """The model found by the last call of solve, as a dict from atoms to truth values, or None."""
+        return None if self.assignment is None else self.symbols.interpretation(self.assignment)
+    # end def
+
+    def solve(self, assumptions: list[Formula] = ()) -> bool:
+        """Checks whether the clauses are satisfiable with every literal in assumptions true (literal formulas, or
+        integer literals of the symbol table). If so, self.assignment (and self.model) give each atom of the clauses
+        and assumptions a truth value satisfying them."""
+        self.assignment = None
+        assumptions = [literal if isinstance(literal, int) else self.symbols.literal(literal) for literal in assumptions]
+        assumptions = [literal << 1 if literal > 0 else -literal << 1 | 1 for literal in assumptions]
+        self._grow()
+        if not self.ok:
+            return False
+        values, trail_limits, heuristic = self.values, self.trail_limits, self.heuristic
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                if not trail_limits:
+                    self.ok = False
+                    return False
+                learned, level = self._analyze(conflict)
+                self._cancel(level)
+                if len(learned) == 1:
+                    self._enqueue(learned[0], None)
+                else:
+                    self._enqueue(learned[0], self._attach(learned))
+                    self.learned += 1
+                continue
+            if len(trail_limits) < len(assumptions):
+                code = assumptions[len(trail_limits)]
+                if values[code] == -1:
+                    self._cancel(0)
+                    return False
+                trail_limits.append(len(self.trail))
+                if values[code] == 0:
+                    self._enqueue(code, None)
+                continue
+            code = heuristic.decide(values)
+            if code is None:
+                self.assignment = [v if values[v << 1] == 1 else -v for v in range(1, len(self.levels))]
+                self._cancel(0)
+                return True
+            trail_limits.append(len(self.trail))
+            self._enqueue(code, None)
+    # end def
+
+    def _attach(self, codes: list) -> int:
+        """Stores a clause of at least two literals, watching its first two, and returns its index."""
+        self.clauses.append(codes)
+        self.watches[codes[0]].append(len(self.clauses) - 1)
+        self.watches[codes[1]].append(len(self.clauses) - 1)
+        return len(self.clauses) - 1
+    # end def
+
+    def _enqueue(self, code: int, reason):
+        self.values[code] = 1
+        self.values[code ^ 1] = -1
+        self.levels[code >> 1] = len(self.trail_limits)
+        self.reasons[code >> 1] = reason
+        self.trail.append(code)
+    # end def
+
+    def _cancel(self, level: int):
+        """Undoes the assignments of the decision levels above level."""
+        if len(self.trail_limits) <= level:
+            return
+        values, unassigned = self.values, self.heuristic.unassigned
+        start = self.trail_limits[level]
+        for code in self.trail[start:]:
+            values[code] = values[code ^ 1] = 0
+            unassigned(code)
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.propagated = min(self.propagated, start)
+    # end def
+
+    def _propagate(self):
+        """Propagates the literals of the trail not yet propagated.
+        Returns the index of a clause whose literals are all false, or None."""
+        values, watches, clauses, trail = self.values, self.watches, self.clauses, self.trail
+        while self.propagated < len(trail):
+            false = trail[self.propagated] ^ 1
+            self.propagated += 1
+            watching = watches[false]
+            kept = 0
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                if values[clause[0]] == 1:
+                    watching[kept] = index
+                    kept += 1
+                    continue
+                for other in range(2, len(clause)):
+                    if values[clause[other]] != -1:
+                        clause[1], clause[other] = clause[other], false
+                        watches[clause[1]].append(index)
+                        break
+                else:
+                    watching[kept] = index
+                    kept += 1
+                    if values[clause[0]] == -1:
+                        watching[kept:] = watching[position + 1:]
+                        return index
+                    self._enqueue(clause[0], index)
+            del watching[kept:]
+        return None
+    # end def
 
+    def _analyze(self, conflict: int) -> tuple[list, int]:
+        """Returns the clause learned from a conflict (first unique implication point), with its asserting
+        literal first and a literal of the highest remaining level second, and the level to jump back to."""
+        seen, levels, reasons, trail, clauses = self.seen, self.levels, self.reasons, self.trail, self.clauses
+        level = len(self.trail_limits)
+        learned = [None]
+        involved = []
+        pending = 0
+        code = None
+        position = len(trail) - 1
+        clause = clauses[conflict]
+        while True:
+            for other in (clause if code is None else clause[1:]):
+                v = other >> 1
+                if not seen[v] and levels[v] > 0:
+                    seen[v] = 1
+                    involved.append(v)
+                    if levels[v] == level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+            while not seen[trail[position] >> 1]:
+                position -= 1
+            code = trail[position]
+            position -= 1
+            seen[code >> 1] = 0
+            pending -= 1
+            if not pending:
+                break
+            clause = clauses[reasons[code >> 1]]
+        learned[0] = code ^ 1
+        for other in learned[1:]:
+            seen[other >> 1] = 0
+        self.heuristic.conflict(involved, learned)
+        if len(learned) == 1:
+            return learned, 0
+        highest = max(range(1, len(learned)), key=lambda i: levels[learned[i] >> 1])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, levels[learned[1] >> 1]
+    # end def
+# end class Solver
@@ -0,0 +1,84 @@
+"""This module checks whether two formulas in propositional logic are logically equivalent without truth tables.
+
+Both formulas are first rewritten into a canonical form sharing one structurally hashed graph: negation normal form,
+where nested conjunctions (disjunctions) are flattened into one BigAnd (BigOr) whose operands are deduplicated and
+sorted. Since formulas are hash-consed (see formula.py), equal canonical subformulas are the same object, so formulas
+that only differ by such rewriting are recognized at once.
+
+Otherwise, a miter is solved: the Tseitin encodings of both canonical formulas (see dpll.TseitinEncoder), with
+one shared atom for each common subformula, plus clauses saying that the two formulas take different values.
+The formulas are equivalent if and only if the miter is unsatisfiable, and the shared atoms leave the solver only
+the part where they differ.
+
+For example, are_equivalent(Implies(p, q), Or(q, Not(p))) returns True without calling the solver.
+"""
+
+from formula import Formula, Atom, Not, Implies, And, BigAnd, BigOr
+from functions import atoms, fold
+from dpll import Solver, TseitinEncoder, BOTH
+
+
+def canonical_form(formula: Formula, cache: dict = None) -> Formula:
+    """Returns a formula equivalent to formula in negation normal form, built with literals, BigAnd and BigOr,
+    in which the operands of each BigAnd (BigOr) are flattened, deduplicated and sorted.
+    Operands are sorted by identity, so canonical forms are comparable within a run of the program, given a
+    shared cache (a dict mapping formulas to the canonical forms of themselves and of their negations,
+    updated by this function)."""
+    if cache is None:
+        cache = {}
+    def combine(node, values):
+        if node in cache:
+            return cache[node]
+        if isinstance(node, Atom):
+            result = (node, Not(node))
+        elif isinstance(node, Not):
+            result = (values[0][1], values[0][0])
+        elif isinstance(node, Implies):
+            result = (_connective(BigOr, [values[0][1], values[1][0]]),
+                      _connective(BigAnd, [values[0][0], values[1][1]]))
+        elif isinstance(node, (And, BigAnd)):
+            result = (_connective(BigAnd, [value[0] for value in values]),
+                      _connective(BigOr, [value[1] for value in values]))
+        else:
+            result = (_connective(BigOr, [value[0] for value in values]),
+                      _connective(BigAnd, [value[1] for value in values]))
+        cache[node] = result
+        return result
+    return fold(formula, combine)[0]
+
+
+def _connective(connective: type, operands: list) -> Formula:
+    flattened = {}
+    for operand in operands:
+        for item in operand.formulas if isinstance(operand, connective) else (operand,):
+            flattened[id(item)] = item
+    if len(flattened) == 1:
+        return next(iter(flattened.values()))
+    return connective(*(flattened[key] for key in sorted(flattened)))
+
+
+def equivalence_counterexample(formula1: Formula, formula2: Formula):
+    """Returns an interpretation of the atoms of both formulas where they take different truth values,
+    or None if they are logically equivalent."""
+    cache = {}
+    canonical1 = canonical_form(formula1, cache)
+    canonical2 = canonical_form(formula2, cache)
+    if canonical1 is canonical2:
+        return None
+    encoder = TseitinEncoder()
+    literal1 = encoder.encode(canonical1, BOTH)
+    literal2 = encoder.encode(canonical2, BOTH)
+    if literal1 == -literal2:
+        return {atom: False for atom in atoms(formula1) | atoms(formula2)}
+    encoder.store.add_literals((literal1, literal2))
+    encoder.store.add_literals((-literal1, -literal2))
+    solver = Solver(encoder.store)
+    if not solver.solve():
+        return None
+    model = solver.model
+    return {atom: model.get(atom, False) for atom in atoms(formula1) | atoms(formula2)}
+
+
+def are_equivalent(formula1: Formula, formula2: Formula) -> bool:
+    """Checks whether formula1 and formula2 are logically equivalent."""
+    return equivalence_counterexample(formula1, formula2) is None
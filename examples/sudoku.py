@@ -1,10 +1,9 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from formula import Atom, Not, And, Or, Implies
+from formula import Atom, Not, And, Implies, BigAnd, BigOr
 from semantics import sat_interpretation
 from dpll import sat_dpll
-from functools import reduce
 import time
 
 '''
@@ -50,21 +49,21 @@ def and_all(list_formulas):
     """
     Returns a BIG AND formula from a list of formulas
     For example, if list_formulas is [Atom('1'), Atom('p'), Atom('r')], it returns
-    And(And(Atom('1'), Atom('p')), Atom('r')).
+    BigAnd(Atom('1'), Atom('p'), Atom('r')).
     :param list_formulas: a list of formulas
-    :return: And formula
+    :return: BigAnd formula
     """
-    return reduce(lambda acc, f: And(acc, f), list_formulas)
+    return BigAnd(*list_formulas)
 
 def or_all(list_formulas):
     """
     Returns a BIG OR of formulas from a list of formulas.
     For example, if list_formulas is [Atom('1'), Atom('p'), Atom('r')], it returns
-    Or(Or(Atom('1'), Atom('p')), Atom('r')).
+    BigOr(Atom('1'), Atom('p'), Atom('r')).
     :param list_formulas: a list of formulas
-    :return: Or formula
+    :return: BigOr formula
     """
-    return reduce(lambda acc, f: Or(acc, f), list_formulas)
+    return BigOr(*list_formulas)
 # the solution must agree with the given digits:
 def given_digits_constraints(grid):
     """
@@ -7,12 +7,66 @@ formula1 = Or(Atom('p'), Atom('s'))
 As another example, the piece of code below creates an object that represents (p → (p v s)).
 
 formula2 = Implies(Atom('p'), Or(Atom('p'), Atom('s')))
+
+Formulas are immutable and hash-consed: building a formula that is structurally equal to an
+existing one returns the very same object, so Atom('p') is Atom('p') and equality is an identity check.
 """
 # from typeguard import typechecked
+from weakref import WeakValueDictionary
+
 
 class Formula:
-    def __init__(self):
-        pass
+    """
+    Base class of all formulas. Every node is interned in a table keyed by its connective and its
+    children, carries its hash precomputed at construction and cannot be modified afterwards.
+    """
+
+    __slots__ = ('_hash', '__weakref__')
+    _interned = WeakValueDictionary()
+
+    @classmethod
+    def _intern(cls, tag: str, *fields):
+        key = (tag,) + fields
+        formula = Formula._interned.get(key)
+        if formula is None:
+            formula = object.__new__(cls)
+            for slot, value in zip(cls.__slots__, fields):
+                object.__setattr__(formula, slot, value)
+            object.__setattr__(formula, '_hash', hash(key))
+            Formula._interned[key] = formula
+        return formula
+    # end def
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, slot) for slot in type(self).__slots__)
+    # end def
+
+    def __eq__(self, other):
+        return self is other
+    # end def
+
+    def __hash__(self):
+        return self._hash
+    # end def
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} formulas are immutable")
+    # end def
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} formulas are immutable")
+    # end def
+
+    def __reduce__(self):
+        return type(self), self._fields()
+    # end def
+
+    def __copy__(self):
+        return self
+    # end def
+
+    def __deepcopy__(self, memo):
+        return self
     # end def
 # end class Formula
 
@@ -22,9 +76,10 @@ class Atom(Formula):
     This class represents propositional logic variables.
     """
 
-    def __init__(self, name: str):
-        super().__init__()
-        self.name = name
+    __slots__ = ('name',)
+
+    def __new__(cls, name: str):
+        return cls._intern('atom', name)
     # end def
 
     def __str__(self):
@@ -33,21 +88,15 @@ class Atom(Formula):
     def __repr__(self):
         return str(self)
     # end def
-    def __eq__(self, other: Formula):
-        return isinstance(other, Atom) and other.name == self.name
-    # end def
-
-    def __hash__(self):
-        return hash((self.name, 'atom'))
-    # end def
 # end class Atom
 
 
 class Implies(Formula):
-    def __init__(self, left: Formula, right: Formula):
-        super().__init__()
-        self.left = left
-        self.right = right
+
+    __slots__ = ('left', 'right')
+
+    def __new__(cls, left: Formula, right: Formula):
+        return cls._intern('implies', left, right)
     # end def
 
     def __str__(self):
@@ -57,21 +106,15 @@ class Implies(Formula):
     def __repr__(self):
         return str(self)
     # end def
-    def __eq__(self, other: Formula):
-        return isinstance(other, Implies) and other.left == self.left and other.right == self.right
-    # end def
-
-    def __hash__(self):
-        return hash((hash(self.left), hash(self.right), 'implies'))
-    # end def
 # end class Implies
 
 
 class Not(Formula):
 
-    def __init__(self, inner: Formula):
-        super().__init__()
-        self.inner = inner
+    __slots__ = ('inner',)
+
+    def __new__(cls, inner: Formula):
+        return cls._intern('not', inner)
     # end def
 
     def __str__(self):
@@ -81,21 +124,15 @@ class Not(Formula):
     def __repr__(self):
         return str(self)
     # end def
-    def __eq__(self, other: Formula):
-        return isinstance(other, Not) and other.inner == self.inner
-    # end def
-
-    def __hash__(self):
-        return hash((hash(self.inner), 'not'))
-    # end def
 # end class Not
 
 
 class And(Formula):
-    def __init__(self, left: Formula, right: Formula):
-        super().__init__()
-        self.left = left
-        self.right = right
+
+    __slots__ = ('left', 'right')
+
+    def __new__(cls, left: Formula, right: Formula):
+        return cls._intern('and', left, right)
     # end def
 
     def __str__(self):
@@ -105,22 +142,15 @@ class And(Formula):
     def __repr__(self):
         return str(self)
     # end def
-    def __eq__(self, other: Formula):
-        return isinstance(other, And) and other.left == self.left and other.right == self.right
-    # end def
-
-    def __hash__(self):
-        return hash((hash(self.left), hash(self.right), 'and'))
-    # end def
 # end class And
 
 
 class Or(Formula):
 
-    def __init__(self, left: Formula, right: Formula):
-        super().__init__()
-        self.left = left
-        self.right = right
+    __slots__ = ('left', 'right')
+
+    def __new__(cls, left: Formula, right: Formula):
+        return cls._intern('or', left, right)
     # end def
 
     def __str__(self):
@@ -130,14 +160,87 @@ class Or(Formula):
     def __repr__(self):
         return str(self)
     # end def
-    def __eq__(self, other: Formula):
-        return isinstance(other, Or) and other.left == self.left and other.right == self.right
+# end class Or
+
+
+class BigAnd(Formula):
+    """
+    Describes the conjunction of any number of formulas, (A1 ∧ A2 ∧ ... ∧ An).
+    Conjunctions passed as arguments are flattened at construction, so a long chain of
+    conjunctions is stored as one shallow node. A single argument is returned unchanged.
+    """
+
+    __slots__ = ('formulas',)
+
+    def __new__(cls, *formulas: Formula):
+        formulas = _flatten(formulas, And, BigAnd)
+        if not formulas:
+            raise ValueError("BigAnd requires at least one formula")
+        if len(formulas) == 1:
+            return formulas[0]
+        return cls._intern('big_and', formulas)
     # end def
 
-    def __hash__(self):
-        return hash((hash(self.left), hash(self.right), 'or'))
+    def __reduce__(self):
+        return type(self), self.formulas
     # end def
-# end class Or
+
+    def __str__(self):
+        return "(" + (" " + u"\u2227" + " ").join(str(formula) for formula in self.formulas) + ")"
+    # end def
+
+    def __repr__(self):
+        return str(self)
+    # end def
+# end class BigAnd
+
+
+class BigOr(Formula):
+    """
+    Describes the disjunction of any number of formulas, (A1 ∨ A2 ∨ ... ∨ An).
+    Disjunctions passed as arguments are flattened at construction, so a long chain of
+    disjunctions is stored as one shallow node. A single argument is returned unchanged.
+    """
+
+    __slots__ = ('formulas',)
+
+    def __new__(cls, *formulas: Formula):
+        formulas = _flatten(formulas, Or, BigOr)
+        if not formulas:
+            raise ValueError("BigOr requires at least one formula")
+        if len(formulas) == 1:
+            return formulas[0]
+        return cls._intern('big_or', formulas)
+    # end def
+
+    def __reduce__(self):
+        return type(self), self.formulas
+    # end def
+
+    def __str__(self):
+        return "(" + (" " + u"\u2228" + " ").join(str(formula) for formula in self.formulas) + ")"
+    # end def
+
+    def __repr__(self):
+        return str(self)
+    # end def
+# end class BigOr
+
+
+def _flatten(formulas, binary, variadic) -> tuple:
+    """Lists, from left to right, the operands of the nested binary/variadic connectives in formulas."""
+    flat = []
+    stack = list(reversed(formulas))
+    while stack:
+        formula = stack.pop()
+        if isinstance(formula, binary):
+            stack.append(formula.right)
+            stack.append(formula.left)
+        elif isinstance(formula, variadic):
+            stack.extend(reversed(formula.formulas))
+        else:
+            flat.append(formula)
+    return tuple(flat)
 
 
 class Iff:
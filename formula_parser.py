@@ -0,0 +1,136 @@
+"""This module turns text into formulas in propositional logic.
+It reads the infix notation printed by the formula classes, with ASCII fallbacks for each connective:
+
+    ¬  ~  !        negation
+    ∧  &  /\\       conjunction
+    ∨  |  \\/       disjunction
+    →  ->  =>      implication
+
+Negation binds tighter than conjunction, which binds tighter than disjunction, which binds tighter than
+implication. Implication associates to the right. A chain of the same conjunction (or disjunction) inside
+one pair of parentheses, such as (p ∧ q ∧ r), becomes a single BigAnd (or BigOr); two operands give And (Or).
+Atom names are the text between connectives and parentheses, so they may contain spaces. A name containing
+parentheses or connective symbols, such as the dataset column petal length (cm) <= 1.5, is written between
+double quotes, "petal length (cm) <= 1.5", with \\" and \\\\ standing for a quote and a backslash inside it.
+
+For example, parse_formula('(p → (p ∨ s))') returns Implies(Atom('p'), Or(Atom('p'), Atom('s'))).
+
+The text printed by str() parses back to an equal formula when no atom name contains parentheses, connective
+symbols or quotes, except that a BigAnd (BigOr) of two operands prints as (p ∧ q) and comes back as And (Or).
+Use quote_atom to write names that need quoting.
+"""
+
+import re
+from formula import Formula, Atom, Not, Implies, And, Or, BigAnd, BigOr
+
+_NOT, _AND, _OR, _IMPLIES, _OPEN, _CLOSE = 'not', 'and', 'or', 'implies', '(', ')'
+
+_SYMBOLS = {
+    u'\u00ac': _NOT, '~': _NOT, '!': _NOT,
+    u'\u2227': _AND, '&': _AND, '/\\': _AND,
+    u'\u2228': _OR, '|': _OR, '\\/': _OR,
+    u'\u2192': _IMPLIES, '->': _IMPLIES, '=>': _IMPLIES,
+    '(': _OPEN, ')': _CLOSE,
+}
+
+_QUOTED = r'"(?:[^"\\]|\\.)*"'
+
+_TOKENS = re.compile('(' + _QUOTED + '|'
+                     + '|'.join(re.escape(symbol) for symbol in sorted(_SYMBOLS, key=len, reverse=True)) + ')')
+
+_UNESCAPE = re.compile(r'\\(.)')
+
+_PRECEDENCE = {_NOT: 4, _AND: 3, _OR: 2, _IMPLIES: 1, _OPEN: 0}
+
+
+def parse_formula(text: str, atoms: dict = None) -> Formula:
+    """Returns the formula written in text. Raises ValueError if text is not a well-formed formula.
+    atoms optionally maps names to Atom objects already created, and is updated with new atoms."""
+    if atoms is None:
+        atoms = {}
+    operands = []
+    # each entry is [connective, number of operands collected so far]
+    operators = []
+    expect_operand = True
+    for piece in _TOKENS.split(text):
+        token = _SYMBOLS.get(piece)
+        if token is None:
+            if piece.startswith('"'):
+                name = _UNESCAPE.sub(r'\1', piece[1:-1])
+            else:
+                name = piece.strip()
+                if not name:
+                    continue
+                if '"' in name:
+                    raise ValueError(f"unterminated quoted atom in {text!r}")
+            if not expect_operand:
+                raise ValueError(f"missing connective before {name!r} in {text!r}")
+            atom = atoms.get(name)
+            if atom is None:
+                atom = atoms[name] = Atom(name)
+            operands.append(atom)
+            expect_operand = False
+        elif token in (_NOT, _OPEN):
+            if not expect_operand:
+                raise ValueError(f"missing connective before {piece!r} in {text!r}")
+            operators.append([token, 1])
+        elif expect_operand:
+            raise ValueError(f"missing formula before {piece!r} in {text!r}")
+        elif token == _CLOSE:
+            while operators and operators[-1][0] != _OPEN:
+                _reduce(operators.pop(), operands)
+            if not operators:
+                raise ValueError(f"unbalanced ')' in {text!r}")
+            operators.pop()
+        else:
+            while operators and _PRECEDENCE[operators[-1][0]] > _PRECEDENCE[token]:
+                _reduce(operators.pop(), operands)
+            if operators and operators[-1][0] == token and token != _IMPLIES:
+                operators[-1][1] += 1
+            else:
+                operators.append([token, 2])
+            expect_operand = True
+    if expect_operand:
+        raise ValueError(f"missing formula at the end of {text!r}")
+    while operators:
+        if operators[-1][0] == _OPEN:
+            raise ValueError(f"unbalanced '(' in {text!r}")
+        _reduce(operators.pop(), operands)
+    return operands[0]
+
+
+def quote_atom(name: str) -> str:
+    """Returns name written as a quoted atom, which parse_formula reads back as Atom(name)."""
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _reduce(operator: list, operands: list):
+    """Replaces the operands on top of the operand stack by the formula built with operator."""
+    connective, count = operator
+    if connective == _NOT:
+        operands.append(Not(operands.pop()))
+        return
+    arguments = operands[-count:]
+    del operands[-count:]
+    if connective == _IMPLIES:
+        operands.append(Implies(*arguments))
+    elif connective == _AND:
+        operands.append(And(*arguments) if count == 2 else BigAnd(*arguments))
+    else:
+        operands.append(Or(*arguments) if count == 2 else BigOr(*arguments))
+
+
+def parse_lines(lines):
+    """Yields one formula for each line of an iterable of strings.
+    Blank lines and lines starting with '#' are skipped. Atoms are shared across lines."""
+    atoms = {}
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield parse_formula(line, atoms)
+
+
+def parse_file(path: str, encoding: str = 'utf-8'):
+    """Yields the formulas of a text file, one per line, reading the file lazily."""
+    with open(path, encoding=encoding) as file:
+        yield from parse_lines(file)
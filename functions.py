@@ -2,16 +2,96 @@
 do some computation on its syntactic structure. """
 
 
-from formula import Formula, Atom, Not, Implies, And, Or
+from typing import NamedTuple
+from formula import Formula, Atom, Not, Implies, And, Or, BigAnd, BigOr
 
 
-def length(formula: Formula) -> int:
-    """Determines the length of a formula in propositional logic."""
+def immediate_subformulas(formula: Formula) -> tuple:
+    """Returns the formulas right below the outermost connective of formula, from left to right.
+    Atoms have no immediate subformulas."""
     if isinstance(formula, Not):
-        return length(formula.inner) + 1
+        return (formula.inner,)
     if isinstance(formula, (Implies, And, Or)):
-        return length(formula.left) + length(formula.right) + 1
-    return 1
+        return (formula.left, formula.right)
+    if isinstance(formula, (BigAnd, BigOr)):
+        return formula.formulas
+    return ()
+
+
+def connectives_at(formula: Formula) -> int:
+    """Returns how many connective symbols the outermost node of formula contributes,
+    that is, 0 for atoms, 1 for Not, Implies, And and Or, and n - 1 for a BigAnd or BigOr of n formulas."""
+    if isinstance(formula, (BigAnd, BigOr)):
+        return len(formula.formulas) - 1
+    return 0 if isinstance(formula, Atom) else 1
+
+
+def distinct_postorder(formula: Formula):
+    """Yields every distinct subformula of formula exactly once, each one after all of its own subformulas.
+    A formula is treated as a DAG: a subformula shared by several parents is visited only once."""
+    visited = set()
+    stack = [formula]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            yield stack.pop()
+            continue
+        if node in visited:
+            continue
+        visited.add(node)
+        stack.append(node)
+        stack.append(None)
+        stack.extend(reversed(immediate_subformulas(node)))
+
+
+def fold(formula: Formula, combine):
+    """Computes a value for formula bottom-up, without recursion.
+    combine(node, values) receives each distinct subformula, after its own subformulas, together with
+    the list of values already computed for its immediate subformulas. Values are memoized per node
+    (formulas are hash-consed, so this is keyed on node identity), hence shared subformulas are
+    combined once and the cost is linear in the number of distinct subformulas."""
+    values = {}
+    for node in distinct_postorder(formula):
+        values[node] = combine(node, [values[child] for child in immediate_subformulas(node)])
+    return values[formula]
+
+
+class FormulaStatistics(NamedTuple):
+    length: int
+    height: int
+    atoms: set
+    connectives: dict
+
+
+def formula_statistics(formula: Formula) -> FormulaStatistics:
+    """Computes the length, the height, the set of atoms and the number of occurrences of
+    each connective (keyed by its formula class) of a formula in a single pass over its distinct subformulas."""
+    order = list(distinct_postorder(formula))
+    occurrences = dict.fromkeys(order, 0)
+    occurrences[formula] = 1
+    for node in reversed(order):
+        for child in immediate_subformulas(node):
+            occurrences[child] += occurrences[node]
+    atoms_set = set()
+    connectives = {}
+    size = 0
+    heights = {}
+    for node in order:
+        if isinstance(node, Atom):
+            atoms_set.add(node)
+            size += occurrences[node]
+            heights[node] = 0
+            continue
+        count = connectives_at(node) * occurrences[node]
+        connectives[type(node)] = connectives.get(type(node), 0) + count
+        size += count
+        heights[node] = 1 + max(heights[child] for child in immediate_subformulas(node))
+    return FormulaStatistics(size, heights[formula], atoms_set, connectives)
+
+
+def length(formula: Formula) -> int:
+    """Determines the length of a formula in propositional logic."""
+    return fold(formula, lambda node, lengths: sum(lengths) + connectives_at(node) if lengths else 1)
 
 
 def subformulas(formula: Formula) -> set:
@@ -26,13 +106,7 @@ def subformulas(formula: Formula) -> set:
     This piece of code prints p, s, (p v s), (p → (p v s))
     (Note that there is no repetition of p)
     """
-    if isinstance(formula, Not):
-        return {formula}.union(subformulas(formula.inner))
-    if isinstance(formula, (Implies, And, Or)):
-        sub1 = subformulas(formula.left)
-        sub2 = subformulas(formula.right)
-        return {formula}.union(sub1).union(sub2)
-    return {formula}
+    return set(distinct_postorder(formula))
 
 #  we have shown in class that, for all formula A, len(subformulas(A)) <= length(A).
 
@@ -49,15 +123,7 @@ def atoms(formula: Formula) -> set:
     This piece of code above prints: p, s
     (Note that there is no repetition of p)
     """
-    atoms_set = set()
-    if isinstance(formula, Atom):
-        atoms_set.add(formula)
-    if isinstance(formula, Not):
-        atoms_set.update(atoms(formula.inner))
-    if isinstance(formula, (Implies, And, Or)):
-        atoms_set.update(atoms(formula.left))
-        atoms_set.update(atoms(formula.right))
-    return atoms_set
+    return {node for node in distinct_postorder(formula) if isinstance(node, Atom)}
 
 
 def number_of_atoms(formula: Formula) -> int:
@@ -67,18 +133,12 @@ def number_of_atoms(formula: Formula) -> int:
 
     must return 3 (Observe that this function counts the repetitions of atoms)
     """
-    if isinstance(formula, Not):
-        return number_of_atoms(formula.inner)
-    if isinstance(formula, (Implies, And, Or)):
-        return number_of_atoms(formula.left) + number_of_atoms(formula.right)
-    return 1
+    return fold(formula, lambda node, counts: sum(counts) if counts else 1)
+
+
 def number_of_connectives(formula: Formula) -> int:
     """Returns the number of connectives occurring in a formula."""
-    if isinstance(formula, Not):
-        return number_of_connectives(formula.inner) + 1
-    if isinstance(formula, (Implies, And, Or)):
-        return number_of_connectives(formula.left) + number_of_connectives(formula.right) + 1
-    return 0
+    return fold(formula, lambda node, counts: sum(counts) + connectives_at(node))
 
 def is_literal(formula: Formula) -> bool:
     """Returns True if formula is a literal. It returns False, otherwise"""
@@ -86,50 +146,92 @@ def is_literal(formula: Formula) -> bool:
 
 def substitution(formula: Formula, old_subformula: Formula, new_subformula: Formula) -> Formula:
     """Returns a new formula obtained by replacing all occurrences
-    of old_subformula in the input formula by new_subformula."""
-    if formula == old_subformula:
-        return new_subformula
+    of old_subformula in the input formula by new_subformula.
+    Formulas are immutable, so the input formula is left untouched."""
+    return substitute(formula, {old_subformula: new_subformula})
+
+
+def substitute(formula: Formula, replacements: dict) -> Formula:
+    """Returns a new formula obtained by replacing, simultaneously and in a single pass, every occurrence
+    of each key of replacements by the corresponding value. Replaced subformulas are not searched further,
+    and values are not substituted again.
+    The input formula is left untouched, and every subformula that does not change is shared with it.
+
+    For example, substitute(Implies(Atom('p'), Atom('q')), {Atom('p'): Atom('q'), Atom('q'): Atom('p')})
+    returns Implies(Atom('q'), Atom('p')).
+    """
+    results = {}
+    stack = [formula]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            node = stack.pop()
+            children = immediate_subformulas(node)
+            new_children = [results[child] for child in children]
+            if all(new is old for new, old in zip(new_children, children)):
+                results[node] = node
+            else:
+                results[node] = type(node)(*new_children)
+        elif node in results:
+            continue
+        elif node in replacements:
+            results[node] = replacements[node]
+        else:
+            stack.append(node)
+            stack.append(None)
+            stack.extend(immediate_subformulas(node))
+    return results[formula]
+
+
+# ranks computed by _cnf_rank: each one includes the ones above it
+_OTHER, _CONJUNCTION, _CLAUSE, _LITERAL = range(4)
+
+
+def _cnf_rank(formula: Formula, ranks: list) -> int:
+    if isinstance(formula, Atom):
+        return _LITERAL
     if isinstance(formula, Not):
-        formula.inner = substitution(formula.inner, old_subformula, new_subformula)
-    if isinstance(formula, (Implies, And, Or)):
-        formula.left = substitution(formula.left, old_subformula, new_subformula)
-        formula.right = substitution(formula.right, old_subformula, new_subformula)
-    return formula
+        return _LITERAL if isinstance(formula.inner, Atom) else _OTHER
+    if isinstance(formula, (Or, BigOr)):
+        return _CLAUSE if min(ranks) >= _CLAUSE else _OTHER
+    if isinstance(formula, (And, BigAnd)):
+        return _CONJUNCTION if min(ranks) >= _CONJUNCTION else _OTHER
+    return _OTHER
+
 
 def is_clause(formula: Formula) -> bool:
     """Returns True if formula is a clause. It returns False, otherwise"""
-    if isinstance(formula, Or):
-        return is_clause(formula.left) and is_clause(formula.right)
-    return is_literal(formula)
+    return fold(formula, _cnf_rank) >= _CLAUSE
 
 
 def is_negation_normal_form(formula: Formula) -> bool:
     """Returns True if formula is in negation normal form.
     Returns False, otherwise."""
+    return fold(formula, _is_nnf_node)
+
+
+def _is_nnf_node(formula: Formula, children_nnf: list) -> bool:
     if isinstance(formula, Implies):
         return False
     if isinstance(formula, Not):
         return isinstance(formula.inner, Atom)
-    if isinstance(formula, (And, Or)):
-        return is_negation_normal_form(formula.left) and is_negation_normal_form(formula.right)
-    return True
+    return all(children_nnf)
 
 
 def is_cnf(formula: Formula) -> bool:
     """Returns True if formula is in conjunctive normal form.
-    Returns False, otherwise."""
-    if isinstance(formula, And):
-        condL = is_clause(formula.left) or is_cnf(formula.left)
-        condR = is_clause(formula.right) or is_cnf(formula.right)
-        return condL and condR
-    return False
-
+    Returns False, otherwise. A single clause is a CNF with one clause."""
+    return fold(formula, _cnf_rank) >= _CONJUNCTION
 
 
 def is_term(formula: Formula) -> bool:
     """Returns True if formula is a term. It returns False, otherwise"""
-    if isinstance(formula, And):
-        return is_clause(formula.left) and is_clause(formula.right)
+    return fold(formula, _is_term_node)
+
+
+def _is_term_node(formula: Formula, children_terms: list) -> bool:
+    if isinstance(formula, (And, BigAnd)):
+        return all(children_terms)
     return is_literal(formula)
 
 
@@ -141,27 +243,49 @@ def is_dnf(formula: Formula) -> bool:
         condL = is_term(formula.left) or is_dnf(formula.left)
         condR = is_term(formula.right) or is_dnf(formula.right)
         return condL and condR
+    if isinstance(formula, BigOr):
+        return all(is_term(subformula) or is_dnf(subformula) for subformula in formula.formulas)
     return False
 
 
 def is_decomposable_negation_normal_form(formula: Formula) -> bool:
-    """Returns True if formula is in decomposable negation normal form.
-    Returns False, otherwise."""
-    if is_negation_normal_form(formula):
-        if isinstance(formula, And):
-            if not (atoms(formula.left) & atoms(formula.right)):
-                return True
-            return is_decomposable_negation_normal_form(formula.left) and is_decomposable_negation_normal_form(formula.right)
-        if isinstance(formula, Or):
-            return is_decomposable_negation_normal_form(formula.left) and is_decomposable_negation_normal_form(formula.right)
-    return False
+    """Returns True if formula is in decomposable negation normal form, that is, it is in negation
+    normal form and the operands of every conjunction share no atoms.
+    Returns False, otherwise.
+    The atoms of each subformula are found by adding the atoms of its smaller operands to the set of its
+    largest operand, which is reused unless that operand has other parents, so a formula tree is checked
+    in O(n log n) steps for n nodes."""
+    order = list(distinct_postorder(formula))
+    parents = {}
+    for node in order:
+        for child in immediate_subformulas(node):
+            parents[child] = parents.get(child, 0) + 1
+    atoms_of = {}
+    for node in order:
+        if isinstance(node, Atom):
+            atoms_of[node] = {node}
+            continue
+        if isinstance(node, Implies) or (isinstance(node, Not) and not isinstance(node.inner, Atom)):
+            return False
+        children = immediate_subformulas(node)
+        largest = max(range(len(children)), key=lambda position: len(atoms_of[children[position]]))
+        merged = atoms_of[children[largest]]
+        if parents[children[largest]] > 1:
+            merged = set(merged)
+        conjunction = isinstance(node, (And, BigAnd))
+        for position, child in enumerate(children):
+            if position == largest:
+                continue
+            for atom in atoms_of[child]:
+                if conjunction and atom in merged:
+                    return False
+                merged.add(atom)
+        atoms_of[node] = merged
+    return True
+
 
 def height(formula: Formula) -> int:
     """Defina uma função recursiva formula_height(formula) que retorna a altura de
 formula, onde a altura é o maior numero de conectivos entre o conectivo mais externo
 e as fórmulas atômicas. Por exemplo, para a fórmula (p → (q ∧ r)) ∨ ¬s, a altura é 3"""
-    if isinstance(formula, Not):
-        return 1 + height(formula.inner)
-    if isinstance(formula, (And, Or, Implies)):
-        return 1 + max(height(formula.left), height(formula.right))
-    return 0
+    return fold(formula, lambda node, heights: 1 + max(heights) if heights else 0)
@@ -0,0 +1,86 @@
+"""This module answers many queries against the same set of premises without converting them again for each query.
+
+A KnowledgeBase encodes its premises once, with a TseitinEncoder (see dpll.py) in linear size, and keeps the
+clauses in an incremental Solver. A query is then answered by a single call of the solver under assumptions: a
+literal query is assumed directly, and any other query is encoded once by the same encoder, and the atom standing
+for it is assumed instead. That atom acts as a selector: the clauses defining it only constrain the premises when
+it is assumed.
+
+For example, the piece of code below asks the queries of examples/mines.py.
+
+kb = KnowledgeBase(no_mines(my_grid) + mines_neighborhood(my_grid))
+kb.entails_all([Atom('1_2'), Not(Atom('1_2')), Atom('1_3'), Not(Atom('1_3'))])
+"""
+
+from formula import Formula, Not
+from dpll import Solver, TseitinEncoder, POSITIVE
+from clause_store import ClauseStore, is_auxiliary
+
+
+class KnowledgeBase:
+    """
+    A set of premises kept as clauses in an incremental Solver. The clauses written by the encoder are passed
+    to the solver after each premise or new query.
+    """
+
+    def __init__(self, premises: list[Formula] = ()):
+        self.premises = []
+        self.solver = Solver()
+        self.encoder = TseitinEncoder(ClauseStore(self.solver.symbols))
+        self._passed = 0
+        for premise in premises:
+            self.add(premise)
+    # end def
+
+    def add(self, premise: Formula):
+        self.premises.append(premise)
+        self.encoder.add(premise)
+        self._pass_clauses()
+    # end def
+
+    def is_consistent(self) -> bool:
+        """Checks whether the premises are satisfiable."""
+        return self.solver.solve()
+    # end def
+
+    def consistent_with(self, query: Formula) -> bool:
+        """Checks whether the premises and query are satisfiable together."""
+        return self.solver.solve([self._assumption(query)])
+    # end def
+
+    def entails(self, query: Formula) -> bool:
+        """Checks whether query is a logical consequence of the premises."""
+        return not self.solver.solve([self._assumption(Not(query))])
+    # end def
+
+    def consistent_with_all(self, queries: list[Formula]) -> list[bool]:
+        return [self.consistent_with(query) for query in queries]
+    # end def
+
+    def entails_all(self, queries: list[Formula]) -> list[bool]:
+        return [self.entails(query) for query in queries]
+    # end def
+
+    def model(self) -> dict:
+        """Returns the interpretation found by the last satisfiable query, restricted to the atoms of the
+        premises and queries, or None if the last query was unsatisfiable."""
+        if self.solver.model is None:
+            return None
+        return {atom: value for atom, value in self.solver.model.items() if not is_auxiliary(atom)}
+    # end def
+
+    def _assumption(self, query: Formula) -> int:
+        """Returns the integer literal to assume for query to be true. The encoder only writes the definitions of
+        the subformulas of query it has not written before."""
+        literal = self.encoder.encode(query, POSITIVE)
+        self._pass_clauses()
+        return literal
+    # end def
+
+    def _pass_clauses(self):
+        store, solver = self.encoder.store, self.solver
+        for index in range(self._passed, len(store)):
+            solver.add_literals(store.clause(index))
+        self._passed = len(store)
+    # end def
+# end class KnowledgeBase
@@ -72,7 +72,7 @@ print(f'formula8: {formula8}')
 print(f'old_subformula: {old_subformula}')
 print(f'new_subformula: {new_subformula}')
 formula8_clone = Implies(Not(And(Atom('p'), Atom('s'))), And(Atom('q'), Not(And(Atom('p'), Atom('s')))))
-substitution(formula8_clone, old_subformula, new_subformula)
+formula8_clone = substitution(formula8_clone, old_subformula, new_subformula)
 print(f'new formula8: {formula8_clone}')
 clause = is_clause(Or(Atom('p'), Or(Atom('q'), Not(Atom('s')))))
 print(f'is_clause(p ∨ q ∨ ¬s): {clause}')
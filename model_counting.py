@@ -0,0 +1,164 @@
+"""This module counts the models of formulas in propositional logic (#SAT) without enumerating them.
+
+The formula is converted to a ClauseStore (see clause_store.py), where literals are signed integers.
+The counter then works like DPLL: it branches on a variable and propagates unit clauses. Two techniques keep it
+far from the 2**n rows of a truth table:
+
+- a clause set whose clauses split into groups sharing no variable (components) has as many models as the
+  product of the models of each group, and the groups are counted separately;
+- the count of every clause set met is cached, keyed by the set itself (a frozenset of frozensets of
+  integers), so a component reached again through other branches is not counted again.
+
+For example, count_models(Or(Atom('p'), Atom('q'))) returns 3.
+"""
+
+from formula import Formula
+from functions import atoms
+from dpll import clause_store_of
+
+
+def count_models(formula: Formula, projection: list = None) -> int:
+    """Returns the number of interpretations of the atoms of formula that satisfy formula.
+    If projection is given, returns the number of interpretations of the atoms in projection that can be
+    extended to a model of formula (atoms of projection that do not occur in formula take both values)."""
+    projection = set(atoms(formula)) if projection is None else set(projection)
+    store = clause_store_of([formula])
+    clauses = set()
+    for clause in store:
+        if not any(-literal in clause for literal in clause):
+            clauses.add(frozenset(clause))
+    numbers = store.symbols.numbers
+    projected = frozenset(numbers[atom] for atom in projection if atom in numbers)
+    # atoms of projection in no clause (some may be left by tautological clauses) take both values
+    free = len(projection) - len(projected & _variables(clauses))
+    return ModelCounter(projected).count(frozenset(clauses)) << free
+
+
+class ModelCounter:
+    """
+    Counts the models of clause sets over integer literals, projected onto the variables in projected:
+    count(clauses) is the number of interpretations of the projected variables occurring in clauses
+    that can be extended to a model of clauses. Counts are cached across calls.
+    """
+
+    def __init__(self, projected: frozenset):
+        self.projected = projected
+        self.cache = {}
+    # end def
+
+    def count(self, clauses: frozenset) -> int:
+        """Returns the count of clauses. The search runs on an explicit stack of _search generators, one for each
+        clause set being counted, so the number of variables is not bounded by Python's recursion limit."""
+        result = self._cached(clauses)
+        if result is not None:
+            return result
+        stack = [self._search(clauses)]
+        result = None
+        while stack:
+            try:
+                child = stack[-1].send(result)
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+                continue
+            result = self._cached(child)
+            if result is None:
+                stack.append(self._search(child))
+        return result
+    # end def
+
+    def _cached(self, clauses: frozenset):
+        if not clauses:
+            return 1
+        return self.cache.get(clauses)
+    # end def
+
+    def _search(self, clauses: frozenset):
+        """Counts clauses, yielding each clause set whose count it needs and receiving that count back.
+        Returns the count of clauses, after caching it."""
+        occurrences = {}
+        for clause in clauses:
+            for literal in clause:
+                occurrences.setdefault(abs(literal), []).append(clause)
+        components = _components(clauses, occurrences)
+        if len(components) > 1:
+            result = 1
+            for component in components:
+                result *= yield component
+                if not result:
+                    break
+        else:
+            projected = self.projected.intersection(occurrences)
+            variable = max(projected or occurrences, key=lambda variable: len(occurrences[variable]))
+            result = 0
+            for literal in (variable, -variable):
+                reduced, assigned = _propagate(clauses, literal)
+                if reduced is None:
+                    continue
+                # projected variables removed from every clause without being assigned take both values
+                count = (yield reduced) << len(projected - assigned - _variables(reduced))
+                if not projected and count:
+                    # without projected variables, the count only tells whether clauses are satisfiable
+                    result = 1
+                    break
+                result += count
+        self.cache[clauses] = result
+        return result
+    # end def
+# end class ModelCounter
+
+
+def _variables(clauses) -> set:
+    return {abs(literal) for clause in clauses for literal in clause}
+
+
+def _propagate(clauses: frozenset, literal: int) -> tuple:
+    """Makes literal true and propagates unit clauses. Returns the simplified clauses and the set of variables
+    assigned, or None and that set if a clause becomes empty."""
+    assigned = set()
+    pending = [literal]
+    while pending:
+        literal = pending.pop()
+        if abs(literal) in assigned:
+            continue
+        assigned.add(abs(literal))
+        simplified = set()
+        for clause in clauses:
+            if literal in clause:
+                continue
+            if -literal in clause:
+                clause = clause - {-literal}
+                if not clause:
+                    return None, assigned
+                if len(clause) == 1:
+                    pending.extend(clause)
+            simplified.add(clause)
+        clauses = simplified
+    return frozenset(clauses), assigned
+
+
+def _components(clauses: frozenset, occurrences: dict) -> list[frozenset]:
+    """Splits clauses into groups such that clauses in different groups share no variable.
+    occurrences maps each variable to the clauses where it occurs."""
+    if len(clauses) == 1:
+        return [clauses]
+    components = []
+    seen = set()
+    for start in occurrences:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = set()
+        stack = [start]
+        while stack:
+            for clause in occurrences[stack.pop()]:
+                if clause not in component:
+                    component.add(clause)
+                    for literal in clause:
+                        if abs(literal) not in seen:
+                            seen.add(abs(literal))
+                            stack.append(abs(literal))
+        if len(component) == len(clauses):
+            return [clauses]
+        components.append(frozenset(component))
+    return components
@@ -1,10 +1,18 @@
 """The goal in this module is to define functions associated with the semantics of formulas in propositional logic. """
 
 from typing import List
-from formula import Formula, Not, Or, And, Implies, Atom
-from functions import atoms, is_literal
-from functools import reduce
-from itertools import product
+from formula import Formula, Not, Or, And, Implies, Atom, BigAnd, BigOr
+from functions import atoms, is_literal, distinct_postorder, immediate_subformulas, fold
+from arena import FormulaArena, ATOM, NOT, IMPLIES, AND, BIG_AND
+from itertools import product, islice
+from array import array
+import sys
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dpll import sat_clauses, clause_store_of, Solver, PLAISTED_GREENBAUM
+from equivalence import are_equivalent
+import multiprocessing
 
 def truth_value(formula: Formula, interpretation: dict) -> bool:
     """Determines the truth value of a formula in an interpretation (valuation).
@@ -18,31 +26,352 @@ def truth_value(formula: Formula, interpretation: dict) -> bool:
         return truth_value(formula.left, interpretation) and truth_value(formula.right, interpretation)
     if isinstance(formula, Implies):
         return not truth_value(formula.left, interpretation) or truth_value(formula.right, interpretation)
+    if isinstance(formula, BigAnd):
+        for subformula in formula.formulas:
+            if not truth_value(subformula, interpretation):
+                return False
+        return True
+    if isinstance(formula, BigOr):
+        for subformula in formula.formulas:
+            if truth_value(subformula, interpretation):
+                return True
+        return False
     return interpretation[formula] # Caso seja Atom
 
+def arena_truth_value(arena: FormulaArena, root: int, interpretation: dict) -> bool:
+    """Determines the truth value of the formula stored in arena at node root.
+    The interpretation maps atoms to truth values, as in truth_value. The nodes are evaluated
+    by one forward loop over the arena arrays, children before parents."""
+    kinds, offsets, operands = arena.kinds, arena.offsets, arena.operands
+    values = {}
+    for index in arena.reachable(root):
+        kind = kinds[index]
+        start = offsets[index]
+        if kind == ATOM:
+            values[index] = interpretation[Atom(arena.atom_names[operands[start]])]
+        elif kind == NOT:
+            values[index] = not values[operands[start]]
+        elif kind == IMPLIES:
+            values[index] = not values[operands[start]] or values[operands[start + 1]]
+        elif kind in (AND, BIG_AND):
+            values[index] = all(values[child] for child in operands[start:offsets[index + 1]])
+        else:
+            values[index] = any(values[child] for child in operands[start:offsets[index + 1]])
+    return values[root]
+
 def partial_truth_value(formula: Formula, interp: dict):
-    if isinstance(formula, Atom):
-        return interp.get(formula)
-    if isinstance(formula, Not):
-        if partial_truth_value(formula.inner, interp) is not None:
-            return not partial_truth_value(formula.inner, interp)
-    if isinstance(formula, Or):
-        return partial_truth_value(formula.left, interp) or partial_truth_value(formula.right, interp)
-    if isinstance(formula, And):
-        return partial_truth_value(formula.left, interp) and partial_truth_value(formula.right, interp)
-    if isinstance(formula, Implies):
-        if partial_truth_value(formula.left, interp) is not None or partial_truth_value(formula.right, interp) is True:
-            return not partial_truth_value(formula.left, interp) or partial_truth_value(formula.right, interp)
-    return None
+    """Returns the truth value of formula under a partial interpretation, following Kleene's three-valued logic:
+    None if the atoms of interp do not determine it. Each distinct subformula is evaluated once."""
+    def combine(node, values):
+        if isinstance(node, Atom):
+            return interp.get(node)
+        if isinstance(node, Not):
+            return None if values[0] is None else not values[0]
+        if isinstance(node, Implies):
+            values = [None if values[0] is None else not values[0], values[1]]
+        if isinstance(node, (And, BigAnd)):
+            return False if False in values else None if None in values else True
+        return True if True in values else None if None in values else False
+    return fold(formula, combine)
+
+# each connective node of a PartialEvaluator is a conjunction or a disjunction of its (possibly negated) operands
+_CONJUNCTION, _DISJUNCTION = 0, 1
+
+class PartialEvaluator:
+    """
+    Evaluates formula under a partial interpretation that changes one atom at a time, following Kleene's
+    three-valued logic like partial_truth_value. Every distinct subformula keeps its current value and the number
+    of its operands that are true and false, so assigning or unassigning an atom only updates the subformulas
+    whose value changes, walking up from the atom. The assignments form a trail: backtrack(level) undoes the
+    assignments made after checkpoint() returned level.
+
+    For example, with evaluator = PartialEvaluator(formula), a search loop calls evaluator.assign(atom, value),
+    checks evaluator.value() (True, False or None) to prune, and calls evaluator.backtrack(level) to go back.
+    """
+
+    def __init__(self, formula: Formula, interpretation: dict = None):
+        self.formula = formula
+        self.values = {}
+        # for each node: [number of true operands, number of false operands, number of operands, kind]
+        self.counts = {}
+        # for each node: list of (parent, operand negated)
+        self.parents = {}
+        self.trail = []
+        for node in distinct_postorder(formula):
+            self.values[node] = None
+            self.parents[node] = []
+            if isinstance(node, Atom):
+                continue
+            operands = immediate_subformulas(node)
+            kind = _CONJUNCTION if isinstance(node, (And, BigAnd, Not)) else _DISJUNCTION
+            self.counts[node] = [0, 0, len(operands), kind]
+            for position, operand in enumerate(operands):
+                negated = isinstance(node, Not) or (isinstance(node, Implies) and position == 0)
+                self.parents[operand].append((node, negated))
+        for atom, value in (interpretation or {}).items():
+            self.assign(atom, value)
+    # end def
+
+    def value(self, subformula: Formula = None):
+        """Returns the current value of formula, or of one of its subformulas."""
+        return self.values[self.formula if subformula is None else subformula]
+    # end def
+
+    def assign(self, atom: Atom, value: bool):
+        """Gives atom a truth value, recording it on the trail."""
+        if self.values.get(atom) is not None:
+            raise ValueError(f"{atom} is already assigned")
+        self.trail.append(atom)
+        if atom in self.values:
+            self._update(atom, value)
+    # end def
+
+    def unassign(self, atom: Atom):
+        """Makes atom unknown again. It must be the last assigned atom still on the trail."""
+        if not self.trail or self.trail[-1] is not atom:
+            raise ValueError(f"{atom} is not the last assigned atom")
+        self.trail.pop()
+        if atom in self.values:
+            self._update(atom, None)
+    # end def
+
+    def checkpoint(self) -> int:
+        return len(self.trail)
+    # end def
+
+    def backtrack(self, level: int):
+        """Unassigns, from the most recent, the atoms assigned after checkpoint() returned level."""
+        while len(self.trail) > level:
+            self.unassign(self.trail[-1])
+    # end def
+
+    def _update(self, node: Formula, value):
+        """Sets the value of node and updates the nodes above it. Values are set as soon as they change, and the
+        pending changes keep the old value, so a node reached through several paths is counted consistently."""
+        values, counts, parents = self.values, self.counts, self.parents
+        changes = [(node, values[node], value)]
+        values[node] = value
+        while changes:
+            node, old, value = changes.pop()
+            for parent, negated in parents[node]:
+                count = counts[parent]
+                if old is not None:
+                    count[old == negated] -= 1
+                if value is not None:
+                    count[value == negated] += 1
+                true, false, operands, kind = count
+                if kind == _CONJUNCTION:
+                    new = False if false else True if true == operands else None
+                else:
+                    new = True if true else False if false == operands else None
+                if new is not values[parent]:
+                    changes.append((parent, values[parent], new))
+                    values[parent] = new
+    # end def
+# end class PartialEvaluator
+
+# largest number of operands joined by one line of the code generated by compile_formula
+_OPERANDS_PER_LINE = 64
+
+def compile_formula(formula: Formula, atoms_list: list = None, bitwise: bool = False):
+    """Compiles formula into a Python function that evaluates it, and returns that function.
+    The function takes a sequence of truth values, one for each atom of atoms_list (in that order),
+    and returns the truth value of formula. atoms_list defaults to the atoms of formula, and is
+    available as the atoms attribute of the returned function.
+    The generated code has one statement per distinct subformula, with no dispatch on the
+    connectives and no dictionary lookups, so calling it many times is cheap.
+
+    If bitwise is True, the function takes (values, mask) instead, where each value is an integer
+    used as a bit vector of truth values and mask has a 1 in every valid bit position. The formula
+    is then evaluated with bitwise operations on all those positions at once."""
+    if atoms_list is None:
+        atoms_list = list(atoms(formula))
+    names = {atom: f"a{position}" for position, atom in enumerate(atoms_list)}
+    lines = [f"def evaluate(values{', mask' if bitwise else ''}):"]
+    if atoms_list:
+        lines.append(f"    {', '.join(names[atom] for atom in atoms_list)}, = values")
+    negation, conjunction, disjunction = ("mask ^ ", " & ", " | ") if bitwise else ("not ", " and ", " or ")
+    for node in distinct_postorder(formula):
+        if isinstance(node, Atom):
+            continue
+        operands = [names[child] for child in immediate_subformulas(node)]
+        if len(operands) > _OPERANDS_PER_LINE and isinstance(node, (BigAnd, BigOr)):
+            # a long chain of & or | is compiled into nested operations, deep enough to reach the recursion limit
+            # of the compiler, so it is split into lines of at most _OPERANDS_PER_LINE operands, forming a tree
+            operator = conjunction if isinstance(node, BigAnd) else disjunction
+            while len(operands) > _OPERANDS_PER_LINE:
+                partial = []
+                for start in range(0, len(operands), _OPERANDS_PER_LINE):
+                    partial.append(f"t{len(lines)}")
+                    lines.append(f"    {partial[-1]} = {operator.join(operands[start:start + _OPERANDS_PER_LINE])}")
+                operands = partial
+        if isinstance(node, Not):
+            expression = negation + operands[0]
+        elif isinstance(node, Implies):
+            expression = f"({negation}{operands[0]}){disjunction}{operands[1]}"
+        elif isinstance(node, (And, BigAnd)):
+            expression = conjunction.join(operands)
+        else:
+            expression = disjunction.join(operands)
+        names[node] = f"n{len(names)}"
+        lines.append(f"    {names[node]} = {expression}")
+    lines.append(f"    return {names[formula]}")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    evaluate = namespace['evaluate']
+    evaluate.atoms = atoms_list
+    return evaluate
+
+# number of rows of the truth table evaluated together by the bit-parallel functions, as a power of 2
+BLOCK_BITS = 16
+
+def truth_table_blocks(formula: Formula, atoms_list: list, fixed: dict = None, start: int = 0, stop: int = None,
+                       block_bits: int = BLOCK_BITS):
+    """Evaluates formula on the rows of its truth table in blocks of 2**block_bits rows, with bitwise
+    operations on integers used as bit vectors (one bit per row).
+    Rows are numbered as in create_truth_table: row r gives atoms_list[i] the value of bit
+    len(atoms_list) - 1 - i of r. The atoms in fixed keep the truth value it gives them.
+    Yields (block, bits) for blocks start to stop - 1, where bit p of bits is the truth value of formula
+    at row block * 2**block_bits + p. See block_mask for the number of rows in a block."""
+    fixed = fixed or {}
+    free = len(atoms_list)
+    low = min(free, block_bits)
+    mask = block_mask(free, block_bits)
+    columns = [mask // ((1 << (2 << j)) - 1) * (((1 << (1 << j)) - 1) << (1 << j)) for j in reversed(range(low))]
+    constants = [mask if value else 0 for value in fixed.values()]
+    evaluate = compile_formula(formula, list(atoms_list) + list(fixed), bitwise=True)
+    high = free - low
+    for block in range(start, (1 << high) if stop is None else stop):
+        values = [mask if (block >> (high - 1 - i)) & 1 else 0 for i in range(high)]
+        yield block, evaluate(values + columns + constants, mask)
+
+def block_mask(atom_count: int, block_bits: int = BLOCK_BITS) -> int:
+    """Returns the bit vector with one bit set for each row of a block of truth_table_blocks."""
+    return (1 << (1 << min(atom_count, block_bits))) - 1
+
+def _row_values(row: int, atom_count: int) -> tuple:
+    return tuple(bool((row >> (atom_count - 1 - i)) & 1) for i in range(atom_count))
+
+def _compiled_truth_table(formula: Formula):
+    """Returns the atoms of the rows of the truth table of formula, a compiled evaluator over them and
+    a generator of the rows as tuples of truth values. Atoms fixed by get_partial_interpretation come last."""
+    interp = get_partial_interpretation(formula)
+    atoms_list = [i for i in atoms(formula) if i not in interp]
+    fixed = tuple(interp.values())
+    evaluate = compile_formula(formula, atoms_list + list(interp))
+    rows = (combination + fixed for combination in product([False, True], repeat=len(atoms_list)))
+    return evaluate.atoms, evaluate, rows
 
 def create_truth_table(formula: Formula):
+    atoms_list, evaluate, rows = _compiled_truth_table(formula)
+    for values in rows:
+        row = dict(zip(atoms_list, values))
+        row[formula] = evaluate(values)
+        yield row
+
+def encoded_truth_table(formula: Formula, chunk_bits: int = BLOCK_BITS):
+    """Returns the truth table of formula as a header and a generator of chunks of rows encoded as integers.
+    The header is the list of the atoms of formula. In the code of a row, bit 0 is the truth value of formula
+    and bit len(header) - i is the truth value of header[i], so the rows come in the order of create_truth_table.
+    Each chunk holds up to 2**chunk_bits rows, as an array('Q') if the codes fit in 64 bits, otherwise a list."""
     interp = get_partial_interpretation(formula)
     atoms_list = [i for i in atoms(formula) if i not in interp]
-    def create_row(combination):
-        row = dict(zip(atoms_list, combination)) | interp
-        row[formula] = truth_value(formula, row)
-        return row
-    yield from map(create_row, product([False, True], repeat=len(atoms_list)))
+    return atoms_list + list(interp), _encoded_rows(formula, atoms_list, interp, chunk_bits)
+
+# turns the characters of a binary numeral into bytes holding 0 or 1
+_BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+def _encoded_rows(formula: Formula, atoms_list: list, interp: dict, chunk_bits: int):
+    fixed_bits = 0
+    for value in interp.values():
+        fixed_bits = fixed_bits << 1 | value
+    shift = len(interp) + 1
+    low = min(len(atoms_list), chunk_bits)
+    steps = [row << shift for row in range(1 << low)]
+    wide = len(atoms_list) + shift > 64
+    for block, bits in truth_table_blocks(formula, atoms_list, interp, block_bits=chunk_bits):
+        base = block << (low + shift) | fixed_bits << 1
+        values = format(bits, 'b').zfill(len(steps))[::-1].encode().translate(_BINARY_DIGITS)
+        rows = [base + step + value for step, value in zip(steps, values)]
+        yield rows if wide else array('Q', rows)
+
+# magic and number of atoms at the start of a truth table file, then the length of each atom name
+_TABLE_HEADER = struct.Struct('<4sQ')
+_TABLE_MAGIC = b'LCTT'
+_NAME_LENGTH = struct.Struct('<I')
+
+def write_truth_table(formula: Formula, file, chunk_bits: int = BLOCK_BITS) -> list:
+    """Writes encoded_truth_table(formula) to file: a header with the atoms of the table, then the rows as
+    little-endian 64-bit unsigned integers, one chunk at a time. The header holds the number of atoms and the
+    UTF-8 name of each, in the order of the bits of the rows, padded to a multiple of 8 bytes. file may be a path
+    (str or os.PathLike) or a binary file object (such as io.BytesIO). Returns the header, as a list of atoms.
+    Raises ValueError if the rows do not fit in 64 bits. See read_truth_table."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'wb') as opened:
+            return write_truth_table(formula, opened, chunk_bits)
+    header, chunks = encoded_truth_table(formula, chunk_bits)
+    if len(header) >= 64:
+        raise ValueError(f"{len(header)} atoms do not fit in 64-bit rows")
+    names = [str(atom.name).encode('utf-8') for atom in header]
+    section = _TABLE_HEADER.pack(_TABLE_MAGIC, len(header)) + b''.join(
+        _NAME_LENGTH.pack(len(name)) + name for name in names)
+    file.write(section + bytes(-len(section) % 8))
+    for rows in chunks:
+        if sys.byteorder == 'big':
+            rows.byteswap()
+        file.write(rows)
+    return header
+
+def read_truth_table(file, chunk_bits: int = BLOCK_BITS) -> tuple:
+    """Reads a truth table written by write_truth_table. Returns the header, as a list of atoms named by strings,
+    and a generator of chunks of up to 2**chunk_bits row codes, as array('Q'), to be decoded with decode_row.
+    file may be a path (str or os.PathLike), closed once the rows are read, or a binary file object.
+    Raises ValueError if file does not start with a truth table header."""
+    if isinstance(file, (str, os.PathLike)):
+        opened = open(file, 'rb')
+        try:
+            header = _read_table_header(opened)
+        except BaseException:
+            opened.close()
+            raise
+        return header, _read_table_rows(opened, chunk_bits, close=True)
+    return _read_table_header(file), _read_table_rows(file, chunk_bits)
+
+def _read_table_header(file) -> list:
+    data = file.read(_TABLE_HEADER.size)
+    if len(data) < _TABLE_HEADER.size or data[:4] != _TABLE_MAGIC:
+        raise ValueError("not a truth table file")
+    size = len(data)
+    header = []
+    for _ in range(_TABLE_HEADER.unpack(data)[1]):
+        length, = _NAME_LENGTH.unpack(file.read(_NAME_LENGTH.size))
+        header.append(Atom(str(file.read(length), 'utf-8')))
+        size += _NAME_LENGTH.size + length
+    file.read(-size % 8)
+    return header
+
+def _read_table_rows(file, chunk_bits: int, close: bool = False):
+    try:
+        while True:
+            data = file.read(8 << chunk_bits)
+            if not data:
+                return
+            rows = array('Q')
+            rows.frombytes(data)
+            if sys.byteorder == 'big':
+                rows.byteswap()
+            yield rows
+    finally:
+        if close:
+            file.close()
+
+def decode_row(code: int, header: list, formula: Formula = None) -> dict:
+    """Turns the code of a row of encoded_truth_table back into the row of create_truth_table.
+    The value of formula is included if formula is given."""
+    row = {atom: bool((code >> (len(header) - i)) & 1) for i, atom in enumerate(header)}
+    if formula is not None:
+        row[formula] = bool(code & 1)
+    return row
 
 def get_partial_interpretation(formula: Formula):
     interp = {}
@@ -53,59 +382,150 @@ def get_partial_interpretation(formula: Formula):
         interp[formula.inner] = not interp[formula.inner]
     if isinstance(formula, And):
         interp = get_partial_interpretation(formula.left) | get_partial_interpretation(formula.right)
+    if isinstance(formula, BigAnd):
+        for subformula in formula.formulas:
+            interp |= get_partial_interpretation(subformula)
     return interp
 
-def is_logical_consequence(premises: List[Formula], conclusion: Formula):  # function TT-Entails? in the book AIMA.
-    """Returns True if the conclusion is a logical consequence of the set of premises. Otherwise, it returns False."""
-    return is_valid(conclusion) if not premises else is_valid(Implies(reduce(lambda acc, pre: And(acc, pre), premises), conclusion))
+# engines of is_logical_consequence and is_valid
+SAT, TRUTH_TABLE = 'sat', 'truth_table'
+
+def is_logical_consequence(premises: List[Formula], conclusion: Formula, engine: str = SAT):  # function TT-Entails? in the book AIMA.
+    """Returns True if the conclusion is a logical consequence of the set of premises. Otherwise, it returns False.
+    With the sat engine, this holds if the premises together with the negation of the conclusion are unsatisfiable,
+    which is checked with the dpll module on the plaisted_greenbaum encoding, as a refutation only needs clauses
+    equisatisfiable with the formulas. With the truth_table engine, the truth table is enumerated."""
+    if engine == TRUTH_TABLE:
+        return is_valid(conclusion, engine=engine) if not premises else is_valid(Implies(BigAnd(*premises), conclusion), engine=engine)
+    _check_engine(engine)
+    return not sat_clauses(clause_store_of(list(premises) + [Not(conclusion)], encoding=PLAISTED_GREENBAUM))
 
-def is_logical_equivalence(formula1, formula2): 
-    """Checks whether formula1 and formula2 are logically equivalent."""
-    return is_valid(And(Implies(formula1, formula2), Implies(formula2, formula1)))    
+def is_logical_equivalence(formula1, formula2, engine: str = SAT): 
+    """Checks whether formula1 and formula2 are logically equivalent.
+    With the sat engine, see the equivalence module. With the truth_table engine, the truth table is enumerated."""
+    if engine == TRUTH_TABLE:
+        return is_valid(And(Implies(formula1, formula2), Implies(formula2, formula1)), engine=engine)
+    _check_engine(engine)
+    return are_equivalent(formula1, formula2)
 
-def is_valid(formula):
-    """Returns True if formula is a logically valid (tautology). Otherwise, it returns False"""
-    return all(i[formula] is True for i in create_truth_table(formula))
+def is_valid(formula, workers: int = None, engine: str = None):
+    """Returns True if formula is a logically valid (tautology). Otherwise, it returns False.
+    With the sat engine (the default), formula is valid if its negation is unsatisfiable, which is checked on the
+    plaisted_greenbaum encoding of the negation.
+    With the truth_table engine (the default if workers is given), blocks of rows of the truth table are checked
+    at once with bitwise operations, and if workers is given, the blocks are split among that many processes."""
+    if engine is None:
+        engine = TRUTH_TABLE if workers else SAT
+    if engine == SAT:
+        return not sat_clauses(clause_store_of([Not(formula)], encoding=PLAISTED_GREENBAUM))
+    _check_engine(engine)
+    return _first_block(formula, list(atoms(formula)), {}, False, workers) is None
 
-def satisfiability_brute_force(formula):
+def _check_engine(engine: str):
+    if engine not in (SAT, TRUTH_TABLE):
+        raise ValueError(f"unknown engine {engine!r}, expected {SAT!r} or {TRUTH_TABLE!r}")
+
+def satisfiability_brute_force(formula, workers: int = None):
     """it will return true if is satisfiable and false if it isnt"""
-    return not all(i[formula] is False for i in create_truth_table(formula))
+    return sat_interpretation(formula, workers) is not False
 
 def duplo_satisfativel(f):
-    first = sat_interpretation(f)
-    if not first:
-        return False
-    lst = []
-    for key, value in first.items():
-        atom = key if value else Not(key)
-        lst.append(atom)
-    and_all = reduce(lambda acc, x: And(acc, x), lst)
-    return sat_interpretation(And(f, Not(and_all))) is not False
+    """Checks whether f has at least two models. Model enumeration stops at the second model found."""
+    return next(islice(iter_models(f), 1, None), None) is not None
 
 def all_models(f):
-    first = sat_interpretation(f)
-    if not first:
-        return False
-    lst2 = []
-    f2 = f
-    while first is not False:
-        first[f] = first.pop(f2)
-        lst2.append(first)
-        lst = []
-        for key, value in first.items():
-            atom = key if value else Not(key)
-            lst.append(atom)
-        and_all = reduce(lambda acc, x: And(acc, x), lst)
-        f2 = And(f2, Not(and_all))
-        first = sat_interpretation(f2)
-    return lst2
-
-def sat_interpretation(formula):
+    """Returns the list of the models of f, each with f itself mapped to True, or False if f is unsatisfiable."""
+    models = [model | {f: True} for model in iter_models(f)]
+    return models or False
+
+def iter_models(formula: Formula, projection: list = None):
+    """Yields the models of formula one at a time, as dicts from atoms to truth values.
+    If projection is given, yields once each interpretation of the atoms in projection that can be extended
+    to a model. Each model found is excluded from later solver calls by adding a blocking clause to the same
+    solver, so the formula is encoded only once and the models are never collected in memory."""
+    projection = list(atoms(formula)) if projection is None else list(projection)
+    solver = Solver(clause_store_of([formula]))
+    numbers = solver.symbols.numbers
+    bound = [atom for atom in projection if atom in numbers]
+    # atoms that occur in no clause take both values in every model
+    free = [atom for atom in projection if atom not in numbers]
+    while solver.solve():
+        literals = [solver.assignment[numbers[atom] - 1] for atom in bound]
+        model = {atom: literal > 0 for atom, literal in zip(bound, literals)}
+        for values in product([False, True], repeat=len(free)):
+            yield model | dict(zip(free, values))
+        if not bound:
+            return
+        solver.add_literals([-literal for literal in literals])
+
+def sat_interpretation(formula, workers: int = None):
     """Checks whether formula is satisfiable.
     In other words, if the input formula is satisfiable, it returns an interpretation that assigns true to the formula.
-    Otherwise, it returns False."""
-    for i in create_truth_table(formula):
-        if i[formula]:
-            return i
-    return False
+    Otherwise, it returns False.
+    If workers is given, the truth table is searched by that many processes, and the result is the same."""
+    interp = get_partial_interpretation(formula)
+    atoms_list = [i for i in atoms(formula) if i not in interp]
+    found = _first_block(formula, atoms_list, interp, True, workers)
+    if found is None:
+        return False
+    block, bits = found
+    row_index = (block << BLOCK_BITS) + (bits & -bits).bit_length() - 1
+    row = dict(zip(atoms_list, _row_values(row_index, len(atoms_list)))) | interp
+    row[formula] = True
+    return row
+
+# chunks of blocks given to each worker process, on average
+CHUNKS_PER_WORKER = 4
+
+def _first_block(formula: Formula, atoms_list: list, fixed: dict, value: bool, workers: int = None):
+    """Searches the truth table of formula (see truth_table_blocks) for rows where formula has the given value.
+    Returns (block, bits) for the first block having such rows, where bits selects them, or None.
+    With workers, the blocks are split into chunks of consecutive blocks (rows whose leading atoms are fixed)
+    that are searched by a pool of processes."""
+    blocks = 1 << max(len(atoms_list) - BLOCK_BITS, 0)
+    if not workers or workers < 2 or blocks < 2:
+        mask = block_mask(len(atoms_list))
+        for block, bits in truth_table_blocks(formula, atoms_list, fixed):
+            if not value:
+                bits ^= mask
+            if bits:
+                return block, bits
+        return None
+    chunk_count = min(blocks, workers * CHUNKS_PER_WORKER)
+    bounds = [blocks * chunk // chunk_count for chunk in range(chunk_count + 1)]
+    arena = FormulaArena()
+    root = arena.add(formula)
+    # index of the first chunk known to have a matching row, shared by all workers
+    first_found = multiprocessing.Value('q', chunk_count)
+    with ProcessPoolExecutor(workers, initializer=_init_search_worker,
+                             initargs=(arena, root, [atom.name for atom in atoms_list],
+                                       {atom.name: fixed[atom] for atom in fixed}, value, first_found)) as pool:
+        futures = [pool.submit(_search_chunk, chunk, bounds[chunk], bounds[chunk + 1]) for chunk in range(chunk_count)]
+        results = [future.result() for future in futures]
+    return next((result for result in results if result is not None), None)
 
+_search_state = {}
+
+def _init_search_worker(arena: FormulaArena, root: int, atom_names: list, fixed: dict, value: bool, first_found):
+    _search_state['formula'] = arena.formula(root)
+    _search_state['atoms'] = [Atom(name) for name in atom_names]
+    _search_state['fixed'] = {Atom(name): truth for name, truth in fixed.items()}
+    _search_state['value'] = value
+    _search_state['first_found'] = first_found
+
+def _search_chunk(chunk: int, start: int, stop: int):
+    """Searches blocks start to stop - 1 in a worker process. Stops early once an earlier chunk has a match."""
+    first_found = _search_state['first_found']
+    atoms_list = _search_state['atoms']
+    mask = block_mask(len(atoms_list))
+    blocks = truth_table_blocks(_search_state['formula'], atoms_list, _search_state['fixed'], start, stop)
+    for block, bits in blocks:
+        if first_found.value < chunk:
+            return None
+        if not _search_state['value']:
+            bits ^= mask
+        if bits:
+            with first_found.get_lock():
+                first_found.value = min(first_found.value, chunk)
+            return block, bits
+    return None
@@ -0,0 +1,175 @@
+"""This module stores formulas and clause lists in a compact binary format that can be loaded with mmap.
+
+A formula file holds a FormulaArena (see arena.py): the node kinds, operand offsets, operands and
+atom table of the arena are written as raw arrays, followed by the indices of the stored roots.
+A clause file holds a clause list as used by the dpll module: the literals of all clauses in one
+array of signed atom numbers (DIMACS-style, starting at 1), the clause offsets, and the atom names.
+
+Loading maps the file into memory and views the arrays in place, so nothing is parsed and no node
+is allocated until it is asked for. Many processes can open the same file and share its pages.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from formula import Formula, Not
+from arena import FormulaArena
+from clause_store import ClauseStore
+
+_FORMULAS_MAGIC = b'LCFA'
+_CLAUSES_MAGIC = b'LCCL'
+# magic, byte order of the arrays, then five 32-bit counts whose meaning depends on the kind of file
+_HEADER = struct.Struct('<4sc3x5I')
+_BYTE_ORDER = b'l' if sys.byteorder == 'little' else b'b'
+
+
+def save_formulas(path: str, formulas: list) -> list[int]:
+    """Stores a list of formulas in a formula file, sharing their common subformulas.
+    Returns the root index of each formula in the stored arena."""
+    arena = FormulaArena()
+    roots = [arena.add(formula) for formula in formulas]
+    save_arena(path, arena, roots)
+    return roots
+
+
+def save_arena(path: str, arena: FormulaArena, roots: list[int]):
+    """Stores a formula arena, together with the indices of its roots of interest, in a formula file."""
+    names = _names_table(arena.atom_names)
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_FORMULAS_MAGIC, _BYTE_ORDER, len(arena.kinds), len(arena.operands),
+                                len(arena.atom_names), len(roots), len(names[1])))
+        kinds = bytes(array('b', arena.kinds))
+        file.write(kinds + bytes(-len(kinds) % 4))
+        for ints in (arena.offsets, arena.operands, arena.atom_nodes, roots, names[0]):
+            file.write(array('i', ints).tobytes())
+        file.write(names[1])
+
+
+def load_arena(path: str) -> tuple[FormulaArena, list[int]]:
+    """Opens a formula file. Returns a read-only arena whose arrays are views of the memory-mapped
+    file, and the list of stored roots. Use arena.formula(root) to build a root as formula objects."""
+    view, swap, counts = _open(path, _FORMULAS_MAGIC)
+    nodes, operands, atoms, roots, names_length = counts
+    position = _HEADER.size
+    kinds = view[position:position + nodes].cast('b')
+    position += nodes + (-nodes % 4)
+    sections = []
+    for count in (nodes + 1, operands, atoms, roots, atoms):
+        sections.append(_ints(view, position, count, swap))
+        position += 4 * count
+    offsets, operand_view, atom_nodes, root_view, name_lengths = sections
+    atom_names = _read_names(view, position, name_lengths)
+    return FormulaArena.from_buffers(kinds, offsets, operand_view, atom_names, atom_nodes), list(root_view)
+
+
+def save_clauses(path: str, clauses: list[set[Formula]]):
+    """Stores a clause list, as used by the dpll module, or a ClauseStore in a clause file."""
+    if isinstance(clauses, ClauseStore):
+        _write_clauses(path, clauses.offsets, clauses.literals, clauses.symbols.atoms[1:])
+        return
+    numbers = {}
+    literals = array('i')
+    offsets = array('i', [0])
+    for clause in clauses:
+        for literal in clause:
+            atom = literal.inner if isinstance(literal, Not) else literal
+            number = numbers.setdefault(atom, len(numbers) + 1)
+            literals.append(-number if atom is not literal else number)
+        offsets.append(len(literals))
+    _write_clauses(path, offsets, literals, numbers)
+
+
+def _write_clauses(path: str, offsets: array, literals: array, atoms):
+    """Writes a clause file, where the atom numbered n is atoms[n - 1]."""
+    names = _names_table(atom.name for atom in atoms)
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_CLAUSES_MAGIC, _BYTE_ORDER, len(offsets) - 1, len(literals),
+                                len(names[0]), 0, len(names[1])))
+        for ints in (offsets, literals, names[0]):
+            file.write(ints.tobytes())
+        file.write(names[1])
+
+
+class StoredClauses:
+    """
+    A clause list read from a clause file. The literals of clause i are the signed atom numbers
+    literals[offsets[i]:offsets[i + 1]], and atom number n is named atom_names[n - 1].
+    """
+
+    def __init__(self, offsets, literals, atom_names: list):
+        self.offsets = offsets
+        self.literals = literals
+        self.atom_names = atom_names
+    # end def
+
+    def __len__(self):
+        return len(self.offsets) - 1
+    # end def
+
+    def clause(self, index: int) -> list[int]:
+        return list(self.literals[self.offsets[index]:self.offsets[index + 1]])
+    # end def
+
+    def clauses(self) -> list[set[Formula]]:
+        """Builds the clause list used by the dpll module."""
+        return self.clause_store().clauses()
+    # end def
+
+    def clause_store(self) -> ClauseStore:
+        """Builds a ClauseStore with the same atom numbers, copying the arrays of the file as they are."""
+        store = ClauseStore.from_literals((), self.atom_names)
+        store.literals.frombytes(memoryview(self.literals).cast('B'))
+        store.offsets = array('i')
+        store.offsets.frombytes(memoryview(self.offsets).cast('B'))
+        return store
+    # end def
+# end class StoredClauses
+
+
+def load_clauses(path: str) -> StoredClauses:
+    """Opens a clause file, viewing its arrays in the memory-mapped file."""
+    view, swap, counts = _open(path, _CLAUSES_MAGIC)
+    clauses, literals, atoms, _, names_length = counts
+    position = _HEADER.size
+    offsets = _ints(view, position, clauses + 1, swap)
+    position += 4 * (clauses + 1)
+    literal_view = _ints(view, position, literals, swap)
+    position += 4 * literals
+    name_lengths = _ints(view, position, atoms, swap)
+    position += 4 * atoms
+    return StoredClauses(offsets, literal_view, _read_names(view, position, name_lengths))
+
+
+def _names_table(names) -> tuple[array, bytes]:
+    encoded = [str(name).encode('utf-8') for name in names]
+    return array('i', map(len, encoded)), b''.join(encoded)
+
+
+def _read_names(view: memoryview, position: int, lengths) -> list[str]:
+    names = []
+    for length in lengths:
+        names.append(str(view[position:position + length], 'utf-8'))
+        position += length
+    return names
+
+
+def _open(path: str, magic: bytes) -> tuple[memoryview, bool, tuple]:
+    with open(path, 'rb') as file:
+        view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    file_magic, byte_order, *counts = _HEADER.unpack(view[:_HEADER.size])
+    if file_magic != magic:
+        raise ValueError(f"{path} is not a {'formula' if magic == _FORMULAS_MAGIC else 'clause'} file")
+    return view, byte_order != _BYTE_ORDER, tuple(counts)
+
+
+def _ints(view: memoryview, position: int, count: int, swap: bool):
+    """Returns count 32-bit integers stored at position. They are viewed in place, unless the file
+    was written with another byte order, in which case they are copied and swapped."""
+    section = view[position:position + 4 * count]
+    if not swap:
+        return section.cast('i')
+    ints = array('i')
+    ints.frombytes(section)
+    ints.byteswap()
+    return ints